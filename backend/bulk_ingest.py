@@ -0,0 +1,188 @@
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from backend.database import get_db
+from backend.match_writer import write_batch
+
+# ================================
+# Bulk resume ingestion
+# ================================
+#   python -m backend.bulk_ingest Uploaded_Resumes/ --workers 8
+# Every PDF under the directory is parsed, its skills extracted and the
+# result stored in the resume cache (so parse_resume() on the same file is
+# a cache hit). Each worker process loads the NER model once and runs NER
+# over a whole chunk of resumes in padded batches; the parent writes each
+# chunk's results and checkpoint rows in one transaction. Files already
+# recorded as done (same size and mtime) are skipped, so an interrupted run
+# picks up where it stopped.
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "32"))      # files per worker task
+INGEST_TORCH_THREADS = int(os.getenv("INGEST_TORCH_THREADS", "1"))  # intra-op threads per worker
+
+
+def _init_checkpoint_table():
+    db = get_db()
+    try:
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS bulk_ingest_checkpoint (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime REAL,
+                content_hash TEXT,
+                status TEXT NOT NULL,
+                error TEXT,
+                ingested_at TEXT
+            )
+        """)
+        db.commit()
+    finally:
+        db.close()
+
+
+def find_resumes(directory: str) -> list:
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths.extend(os.path.join(root, f) for f in files if f.lower().endswith(".pdf"))
+    return sorted(paths)
+
+
+def pending_files(paths: list) -> list:
+    """Paths not yet ingested, or changed (size/mtime) since they were."""
+    db = get_db()
+    try:
+        done = {
+            path: (size, mtime)
+            for path, size, mtime in db.execute(
+                "SELECT path, size, mtime FROM bulk_ingest_checkpoint WHERE status = 'done'"
+            )
+        }
+    finally:
+        db.close()
+    pending = []
+    for path in paths:
+        st = os.stat(path)
+        if done.get(path) != (st.st_size, st.st_mtime):
+            pending.append(path)
+    return pending
+
+
+# -------------------------
+# Worker process
+# -------------------------
+def _init_worker(torch_threads: int):
+    # One worker per core scales better than a few workers each using every core
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    from backend import models
+    import backend.resume_job_parser  # noqa: F401  (registers "ner" and "skill_matcher")
+    models.warm_up("ner", "skill_matcher")
+
+
+def _parse_chunk(paths: list, batch_size: int) -> tuple:
+    """
+    (extractor version, [(path, size, mtime, content_hash, result, error)])
+    for a chunk of PDFs. The version names the NER model this worker loaded.
+    """
+    from backend.resume_cache import content_hash
+    from backend.resume_job_parser import pdf_text, resume_result, extract_skills_batch, extractor_version
+
+    out, texts = [], []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            with open(path, "rb") as fh:
+                data = fh.read()
+            texts.append(pdf_text(data))
+            out.append([path, st.st_size, st.st_mtime, content_hash(data), None, None])
+        except Exception as e:
+            out.append([path, None, None, None, None, str(e)])
+
+    parsed = [row for row in out if row[5] is None]
+    for row, text, skills in zip(parsed, texts, extract_skills_batch(texts, batch_size=batch_size)):
+        row[4] = resume_result(text, skills)
+    return extractor_version(), [tuple(row) for row in out]
+
+
+# -------------------------
+# Parent process
+# -------------------------
+def _write_chunk(cache, rows: list):
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    write_batch(get_db, [
+        cache.insert_statement([(key, result) for _, _, _, key, result, error in rows if error is None]),
+        ("""
+            INSERT OR REPLACE INTO bulk_ingest_checkpoint (path, size, mtime, content_hash, status, error, ingested_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (path, size, mtime, key, "done" if error is None else "failed", error, now)
+            for path, size, mtime, key, _, error in rows
+        ]),
+    ])
+
+
+def ingest_directory(directory: str, workers: int = None, chunk_size: int = INGEST_CHUNK_SIZE,
+                     batch_size: int = None, restart: bool = False) -> dict:
+    from backend.resume_cache import ResumeCache
+    from backend.resume_job_parser import NER_BATCH_SIZE
+
+    workers = workers or os.cpu_count() or 1
+    batch_size = batch_size or NER_BATCH_SIZE
+    _init_checkpoint_table()
+    caches = {}  # extractor version reported by the workers -> ResumeCache; the parent never loads NER
+
+    paths = find_resumes(directory)
+    todo = paths if restart else pending_files(paths)
+    print(f"📂 {len(paths)} PDFs found, {len(paths) - len(todo)} already ingested, {len(todo)} to go")
+    stats = {"found": len(paths), "ingested": 0, "failed": 0, "seconds": 0.0}
+    if not todo:
+        return stats
+
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+    workers = min(workers, len(chunks))
+    start = time.perf_counter()
+    # spawn: workers must not inherit a parent that may already hold torch threads
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(INGEST_TORCH_THREADS,)) as pool:
+        futures = [pool.submit(_parse_chunk, chunk, batch_size) for chunk in chunks]
+        for future in as_completed(futures):
+            version, rows = future.result()
+            if version not in caches:
+                caches[version] = ResumeCache(version)
+            _write_chunk(caches[version], rows)
+            failed = sum(1 for row in rows if row[5] is not None)
+            stats["ingested"] += len(rows) - failed
+            stats["failed"] += failed
+            done = stats["ingested"] + stats["failed"]
+            elapsed = time.perf_counter() - start
+            print(f"   {done}/{len(todo)} files, {done / elapsed:.1f} files/s")
+
+    stats["seconds"] = time.perf_counter() - start
+    print(f"✅ Ingested {stats['ingested']} resumes ({stats['failed']} failed) in {stats['seconds']:.1f}s "
+          f"— {(stats['ingested'] + stats['failed']) / stats['seconds']:.1f} files/s with {workers} workers")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse and index a directory of PDF resumes.")
+    parser.add_argument("directory")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=INGEST_CHUNK_SIZE, help="files per worker task")
+    parser.add_argument("--batch-size", type=int, default=None, help="NER batch size within a worker")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and re-ingest everything")
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.directory):
+        parser.error(f"not a directory: {args.directory}")
+    stats = ingest_directory(args.directory, workers=args.workers, chunk_size=args.chunk_size,
+                             batch_size=args.batch_size, restart=args.restart)
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
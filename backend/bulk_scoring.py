@@ -0,0 +1,125 @@
+import numpy as np
+from scipy import sparse
+
+# ================================
+# Bulk resume × job scoring
+# ================================
+# Same score as match_resume_to_job: share of the job's (lowercased) skills
+# that the resume has, in percent, rounded to 2 decimals. Jobs without
+# skills score 0. Scores are computed and rounded in float64 exactly like
+# the per-pair path, so they compare equal to its results.
+RESUME_BLOCK_SIZE = 2048  # resumes scored per block; bounds the dense score block in memory
+
+
+def _normalize(skill_sets: list) -> list:
+    return [{s.lower() for s in skills if s and s.strip()} for skills in skill_sets]
+
+
+def build_vocabulary(*skill_set_lists) -> dict:
+    vocab = {}
+    for skill_sets in skill_set_lists:
+        for skills in skill_sets:
+            for s in skills:
+                vocab.setdefault(s, len(vocab))
+    return vocab
+
+
+def to_sparse(skill_sets: list, vocab: dict) -> sparse.csr_matrix:
+    """Binary (len(skill_sets), len(vocab)) matrix; unknown skills are ignored."""
+    rows, cols = [], []
+    for i, skills in enumerate(skill_sets):
+        for s in skills:
+            j = vocab.get(s)
+            if j is not None:
+                rows.append(i)
+                cols.append(j)
+    data = np.ones(len(rows), dtype=np.float32)
+    return sparse.csr_matrix((data, (rows, cols)), shape=(len(skill_sets), len(vocab)), dtype=np.float32)
+
+
+def _top_k(scores: np.ndarray, k: int) -> tuple:
+    """Indices and values of the k best entries per row, best first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty = np.zeros((scores.shape[0], 0))
+        return empty.astype(int), empty
+    idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    vals = np.take_along_axis(scores, idx, axis=1)
+    order = np.argsort(-vals, axis=1, kind="stable")
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(vals, order, axis=1)
+
+
+def _round_scores(raw: np.ndarray) -> np.ndarray:
+    """round(x, 2) element-wise with Python's semantics (np.round can differ at ties)."""
+    # Scores take few distinct values, so each distinct value is rounded once
+    uniq, inverse = np.unique(raw, return_inverse=True)
+    rounded = np.array([round(float(v), 2) for v in uniq], dtype=np.float64)
+    return rounded[inverse].reshape(raw.shape)
+
+
+def score_blocks(resume_skill_sets: list, job_skill_sets: list, block_size: int = RESUME_BLOCK_SIZE):
+    """
+    Yield (first resume index, dense score block) for consecutive blocks of
+    resumes. Each block is (n_block, n_jobs) float64 percentages.
+    """
+    resumes = _normalize(resume_skill_sets)
+    jobs = _normalize(job_skill_sets)
+    vocab = build_vocabulary(jobs)   # resume skills no job asks for cannot change a score
+    R = to_sparse(resumes, vocab)
+    J = to_sparse(jobs, vocab)
+    job_sizes = np.asarray(J.sum(axis=1), dtype=np.float64).ravel()
+    has_skills = job_sizes > 0
+    JT = J.T.tocsc()
+
+    for start in range(0, R.shape[0], block_size):
+        # matched skill counts (small integers, exact in the float32 product)
+        overlap = (R[start:start + block_size] @ JT).toarray().astype(np.float64)
+        # len(matched) / len(job_skills) * 100, in the same order as match_resume_to_job
+        raw = np.divide(overlap, job_sizes, out=np.zeros_like(overlap), where=has_skills) * 100
+        yield start, _round_scores(raw)
+
+
+def score_matrix(resume_skill_sets: list, job_skill_sets: list) -> np.ndarray:
+    """Full (n_resumes, n_jobs) score matrix. Use bulk_top_k for large corpora."""
+    blocks = [block for _, block in score_blocks(resume_skill_sets, job_skill_sets)]
+    if not blocks:
+        return np.zeros((0, len(job_skill_sets)), dtype=np.float64)
+    return np.vstack(blocks)
+
+
+def bulk_top_k(resume_skill_sets: list, job_skill_sets: list, k: int = 10,
+               block_size: int = RESUME_BLOCK_SIZE) -> dict:
+    """
+    Rank every job for every resume and every resume for every job without
+    materializing the full score matrix.
+
+    Returns:
+        {
+          "jobs_for_resume": [[(job_index, score), ...], ...],     # one list per resume
+          "resumes_for_job": [[(resume_index, score), ...], ...],  # one list per job
+        }
+    """
+    if k <= 0:
+        return {"jobs_for_resume": [[] for _ in resume_skill_sets], "resumes_for_job": [[] for _ in job_skill_sets]}
+
+    n_jobs = len(job_skill_sets)
+    jobs_for_resume = []
+    best_idx = np.zeros((n_jobs, 0), dtype=int)       # running top-k resumes per job
+    best_val = np.zeros((n_jobs, 0), dtype=np.float64)
+
+    for start, block in score_blocks(resume_skill_sets, job_skill_sets, block_size):
+        idx, vals = _top_k(block, k)
+        jobs_for_resume.extend(
+            [(int(j), float(v)) for j, v in zip(row_idx, row_val)] for row_idx, row_val in zip(idx, vals)
+        )
+
+        idx, vals = _top_k(block.T, k)
+        cand_idx = np.hstack([best_idx, idx + start])
+        cand_val = np.hstack([best_val, vals])
+        keep, best_val = _top_k(cand_val, k)
+        best_idx = np.take_along_axis(cand_idx, keep, axis=1)
+
+    resumes_for_job = [
+        [(int(r), float(v)) for r, v in zip(row_idx, row_val)] for row_idx, row_val in zip(best_idx, best_val)
+    ]
+    return {"jobs_for_resume": jobs_for_resume, "resumes_for_job": resumes_for_job}
@@ -1,37 +1,148 @@
-import sqlite3
 import os
+import threading
+from backend.db_pool import SQLitePool
 
 DB_PATH = os.getenv("DB_PATH", "career_captain.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "64"))
+
+def _configure(conn):
+    # WAL lets readers proceed while a writer commits, so concurrent Streamlit
+    # sessions no longer serialize on the database file.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # Lock waits use the 30s timeout SQLitePool passes to sqlite3.connect
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-16000")  # ~16 MB page cache per connection
+
+# Per-thread SQLite connections shared by the app, auth and the caches
+_pool = SQLitePool(DB_PATH, max_size=DB_POOL_SIZE, setup=_configure)
+
+# ================================
+# Versioned migrations (tracked in PRAGMA user_version)
+# ================================
+# Append new steps; never edit a step that has already shipped.
+MIGRATIONS = [
+    # 1: original schemas of backend/database.py (searches) and main.py (user_searches)
+    [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE NOT NULL,
+            password BLOB NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS searches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT NOT NULL,
+            keywords TEXT,
+            location TEXT,
+            job_title TEXT,
+            company TEXT,
+            matched_skills TEXT,
+            missing_skills TEXT,
+            summary TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS user_searches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT,
+            keywords TEXT,
+            location TEXT,
+            timestamp TEXT,
+            top_job TEXT,
+            score INTEGER
+        )
+        """,
+    ],
+    # 2: history lookups by user, newest first
+    [
+        "CREATE INDEX IF NOT EXISTS idx_searches_user_ts ON searches (user_email, timestamp, id)",
+        "CREATE INDEX IF NOT EXISTS idx_user_searches_user_ts ON user_searches (username, timestamp, id)",
+    ],
+    # 3: unify the two tables: searches holds one row per result (now with its
+    #    score), user_searches one row per search with its best match
+    [
+        "ALTER TABLE searches ADD COLUMN score REAL",
+        "ALTER TABLE searches ADD COLUMN link TEXT",
+    ],
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+_init_lock = threading.Lock()
 
 def init_db():
-    db = sqlite3.connect(DB_PATH)
-    cursor = db.cursor()
-
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        email TEXT UNIQUE NOT NULL,
-        password BLOB NOT NULL
-    )
-    """)
-
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS searches (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_email TEXT NOT NULL,
-        keywords TEXT,
-        location TEXT,
-        job_title TEXT,
-        company TEXT,
-        matched_skills TEXT,
-        missing_skills TEXT,
-        summary TEXT,
-        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-
-    db.commit()
-    db.close()
+    """
+    Bring the database up to SCHEMA_VERSION. Safe to call on every start and
+    from several processes at once: each migration runs in its own
+    BEGIN IMMEDIATE transaction (the write lock is held from the start),
+    re-reads user_version inside it and bumps it in the same transaction, so
+    a step is applied exactly once and a failed step leaves nothing behind.
+    An up-to-date schema is detected with a plain read, without the lock.
+    """
+    with _init_lock:
+        db = get_db()
+        try:
+            if db.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+                return
+            while True:
+                db.execute("BEGIN IMMEDIATE")
+                try:
+                    version = db.execute("PRAGMA user_version").fetchone()[0]
+                    if version >= SCHEMA_VERSION:
+                        db.rollback()
+                        return
+                    for sql in MIGRATIONS[version]:
+                        db.execute(sql)
+                    db.execute(f"PRAGMA user_version = {version + 1}")
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    raise
+        finally:
+            db.close()
 
 def get_db():
-    return sqlite3.connect(DB_PATH)
+    """Pooled connection for this thread; close() returns it to the pool."""
+    return _pool.acquire()
+
+# ================================
+# Search history (keyset pagination)
+# ================================
+def _history_page(sql, params, limit):
+    db = get_db()
+    try:
+        cursor = db.execute(sql, params + [limit])
+        columns = [c[0] for c in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    finally:
+        db.close()
+    next_cursor = (rows[-1]["timestamp"], rows[-1]["id"]) if len(rows) == limit else None
+    return rows, next_cursor
+
+def get_search_history(user_email, limit=20, before=None):
+    """
+    Per-result history for a user, newest first.
+    Pass the returned cursor as `before` to get the next page; it is None on
+    the last page. Uses idx_searches_user_ts, so every page costs the same
+    however long the history is.
+    """
+    sql = "SELECT * FROM searches WHERE user_email = ?"
+    params = [user_email]
+    if before:
+        sql += " AND (timestamp, id) < (?, ?)"
+        params += list(before)
+    sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+    return _history_page(sql, params, limit)
+
+def get_user_search_history(username, limit=20, before=None):
+    """One row per search (best match and score), newest first; same paging as get_search_history."""
+    sql = "SELECT * FROM user_searches WHERE username = ?"
+    params = [username]
+    if before:
+        sql += " AND (timestamp, id) < (?, ?)"
+        params += list(before)
+    sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+    return _history_page(sql, params, limit)
@@ -0,0 +1,165 @@
+import queue
+import sqlite3
+import threading
+
+# ================================
+# Pooled database connections
+# ================================
+# Callers keep the usual pattern:
+#     db = pool.acquire()
+#     try: ...; db.commit()
+#     finally: db.close()
+# close() hands the connection back to the pool (rolling back anything left
+# uncommitted) instead of tearing it down.
+
+
+class PooledConnection:
+    """Thin handle around a pooled connection; close() releases it."""
+
+    def __init__(self, pool, conn, overflow: bool = False):
+        self._pool = pool
+        self._conn = conn
+        self._overflow = overflow
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool.release(self._conn, self._overflow)
+
+
+class SQLitePool:
+    """
+    One connection per thread, reused across operations on that thread.
+    At most max_size threads hold a pooled connection; connections of
+    threads that have exited are closed and their slot reused. Beyond
+    max_size, callers get a short-lived connection that is closed on release.
+    """
+
+    def __init__(self, path: str, max_size: int = 64, setup=None):
+        self.path = path
+        self.max_size = max_size
+        self._setup = setup
+        self._local = threading.local()
+        self._conns = {}   # thread ident -> connection
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # Each connection is only used by the thread it belongs to; allowing
+        # other threads lets the pool close connections of exited threads.
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        if self._setup:
+            self._setup(conn)
+        return conn
+
+    @staticmethod
+    def _healthy(conn) -> bool:
+        try:
+            conn.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self) -> PooledConnection:
+        conn = getattr(self._local, "conn", None)
+        depth = getattr(self._local, "depth", 0)
+        if conn is not None and depth == 0 and not self._healthy(conn):
+            self._discard(threading.get_ident())
+            conn = None
+
+        if conn is None:
+            with self._lock:
+                alive = {t.ident for t in threading.enumerate()}
+                for ident in [i for i in self._conns if i not in alive]:
+                    self._discard(ident)
+                if len(self._conns) >= self.max_size:
+                    return PooledConnection(self, self._connect(), overflow=True)
+                conn = self._connect()
+                self._conns[threading.get_ident()] = conn
+            self._local.conn = conn
+
+        self._local.depth = depth + 1
+        return PooledConnection(self, conn)
+
+    def release(self, conn, overflow: bool = False):
+        if overflow:
+            conn.close()
+            return
+        self._local.depth -= 1
+        if self._local.depth == 0 and conn.in_transaction:
+            conn.rollback()
+
+    def _discard(self, ident: int):
+        conn = self._conns.pop(ident, None)
+        if ident == threading.get_ident():
+            self._local.conn = None
+            self._local.depth = 0
+        if conn is not None:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def close_all(self):
+        with self._lock:
+            for ident in list(self._conns):
+                self._discard(ident)
+
+
+class ConnectionPool:
+    """
+    Bounded pool for client/server databases (e.g. pymysql). connect is a
+    zero-argument factory. Idle connections are health-checked with
+    ping(reconnect=True) before reuse; acquire() blocks for up to `timeout`
+    seconds when max_size connections are already checked out.
+    """
+
+    def __init__(self, connect, max_size: int = 10, timeout: float = 30):
+        self._connect = connect
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def acquire(self) -> PooledConnection:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError("Database connection pool exhausted")
+        try:
+            try:
+                conn = self._idle.get_nowait()
+                try:
+                    conn.ping(reconnect=True)
+                except Exception:
+                    self._close_quietly(conn)
+                    conn = self._connect()
+            except queue.Empty:
+                conn = self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+        return PooledConnection(self, conn)
+
+    def release(self, conn, overflow: bool = False):
+        try:
+            conn.rollback()
+            self._idle.put(conn)
+        except Exception:
+            self._close_quietly(conn)
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        while True:
+            try:
+                self._close_quietly(self._idle.get_nowait())
+            except queue.Empty:
+                return
@@ -0,0 +1,82 @@
+import os
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from backend.job_store import posting_hash
+
+# ================================
+# Parallel fan-out of multi-keyword job queries
+# ================================
+FANOUT_MAX_WORKERS = int(os.getenv("FANOUT_MAX_WORKERS", "4"))  # concurrent actor runs
+FANOUT_TIMEOUT = float(os.getenv("FANOUT_TIMEOUT", "120"))       # seconds for the whole fan-out
+
+
+def split_queries(keywords: str, location: str) -> list:
+    """
+    "AI Engineer, Machine Learning" x "Chennai, India; Remote" ->
+    [(kw, loc)] for every keyword/location pair. Keywords are comma-separated;
+    locations are separated by ";" or "|" since they usually contain commas.
+    """
+    kws = list(dict.fromkeys(k.strip() for k in (keywords or "").split(",") if k.strip())) or [keywords or ""]
+    locs = list(dict.fromkeys(l.strip() for l in (location or "").replace("|", ";").split(";") if l.strip()))
+    return [(k, l) for k in kws for l in (locs or [location or ""])]
+
+
+def _dedupe_key(job: dict) -> str:
+    return job.get("Job URL") or job.get("Link") or posting_hash(job)
+
+
+def merge_results(result_lists: list, max_items: int) -> list:
+    """Round-robin across queries so each one contributes, skipping duplicate Job URLs."""
+    merged, seen = [], set()
+    iters = [iter(r) for r in result_lists]
+    while iters and len(merged) < max_items:
+        alive = []
+        for it in iters:
+            for job in it:
+                key = _dedupe_key(job)
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(job)
+                    alive.append(it)
+                    break
+            if len(merged) >= max_items:
+                break
+        iters = alive
+    return merged
+
+
+def fan_out(queries: list, fetch_one, max_items: int, per_query: int = None,
+            timeout: float = FANOUT_TIMEOUT, max_workers: int = FANOUT_MAX_WORKERS) -> list:
+    """
+    Run fetch_one(keywords, location, quota) for every (keywords, location)
+    query concurrently and merge the results, deduplicated by Job URL.
+    Each query fetches at most per_query postings (default: an even share
+    of max_items). Queries that fail are logged and skipped; queries still
+    running after `timeout` seconds are abandoned, so wall time is bounded
+    by the slowest query (or the timeout), not the sum.
+    """
+    if not queries:
+        return []
+    quota = per_query or max(1, math.ceil(max_items / len(queries)))
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries))))
+    futures = {pool.submit(fetch_one, kw, loc, quota): i for i, (kw, loc) in enumerate(queries)}
+    results = [[] for _ in queries]
+    deadline = time.monotonic() + timeout
+    pending = set(futures)
+    try:
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print(f"⚠️ {len(pending)} job queries timed out after {timeout:g}s")
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                kw, loc = queries[futures[future]]
+                try:
+                    results[futures[future]] = future.result() or []
+                except Exception as e:
+                    print(f"⚠️ Job query '{kw}' in '{loc}' failed: {e}")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return merge_results(results, max_items)
@@ -1,14 +1,138 @@
-
 import os
-import google.generativeai as genai
+import re
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from backend import models
+from backend.llm_cache import LLMCache
 
 # ==============================
-# ✅ Configure Gemini API
+# ✅ Configure Gemini API (on first use)
 # ==============================
-genai.configure(api_key=os.getenv("GEMINI_API_KEY", "YOUR_GEMINI_API_KEY_HERE"))
-
 MODEL_NAME = "gemini-2.5-flash"
-model = genai.GenerativeModel(MODEL_NAME)
+
+
+def _load_genai():
+    import google.generativeai as genai
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY", "YOUR_GEMINI_API_KEY_HERE"))
+    return genai
+
+models.register("genai", _load_genai)
+
+
+# Set GEMINI_STUB=1 to run without network access or an API key (tests, offline demos)
+USE_STUB_MODEL = os.getenv("GEMINI_STUB") == "1"
+
+
+class StubModel:
+    """Offline stand-in for genai.GenerativeModel with a deterministic reply."""
+
+    class _Response:
+        def __init__(self, text):
+            self.text = text
+
+    def __init__(self, name: str = "stub"):
+        self.name = name
+
+    def generate_content(self, prompt, stream: bool = False, **kwargs):
+        text = f"[{self.name}] " + " ".join(str(prompt).split())[:200]
+        if stream:
+            return [self._Response(word + " ") for word in text.split(" ")]
+        return self._Response(text)
+
+
+def get_model(name: str = MODEL_NAME):
+    """Return a Gemini model, importing and configuring the SDK on first use."""
+    key = f"gemini:{name}"
+    if not models.is_registered(key):
+        if USE_STUB_MODEL:
+            models.register(key, lambda: StubModel(name))
+        else:
+            models.register(key, lambda: models.get("genai").GenerativeModel(name))
+    return models.get(key)
+
+
+def set_model(model, name: str = MODEL_NAME):
+    """Replace the model used for `name`, e.g. with a StubModel in tests."""
+    key = f"gemini:{name}"
+    models.register(key, lambda: model)
+    models.unload(key)
+
+
+# ==============================
+# 💾 Cached generation
+# ==============================
+LLM_CACHE_DISABLED = os.getenv("LLM_CACHE_DISABLED") == "1"
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+
+models.register("llm_cache", lambda: LLMCache(ttl=LLM_CACHE_TTL))
+
+
+def generate_text(prompt: str, model_name: str = MODEL_NAME, use_cache: bool = True, **kwargs) -> str:
+    """
+    Call Gemini and return the stripped response text.
+    Identical (model, prompt) pairs are answered from the persistent cache;
+    pass use_cache=False (or set LLM_CACHE_DISABLED=1) to bypass it.
+    Exceptions from the model propagate and are never cached.
+    """
+    use_cache = use_cache and not LLM_CACHE_DISABLED
+    if use_cache:
+        cached = models.get("llm_cache").get(model_name, prompt)
+        if cached is not None:
+            return cached
+
+    response = get_model(model_name).generate_content(prompt, **kwargs)
+    text = response.text.strip()
+    if use_cache:
+        models.get("llm_cache").put(model_name, prompt, text)
+    return text
+
+
+def cache_stats() -> dict:
+    return models.get("llm_cache").stats()
+
+
+# ==============================
+# 🌊 Streamed generation
+# ==============================
+# Most recent streamed calls: {"name", "ttft", "total", "cached"} (seconds)
+STREAM_METRICS = deque(maxlen=500)
+
+
+def generate_text_stream(prompt: str, model_name: str = MODEL_NAME, use_cache: bool = True,
+                         metric_name: str = "generate", **kwargs):
+    """
+    Like generate_text, but yields text chunks as Gemini produces them and
+    records time-to-first-token in STREAM_METRICS. A cache hit is yielded as
+    a single chunk; a completed stream is written to the cache.
+    """
+    use_cache = use_cache and not LLM_CACHE_DISABLED
+    start = time.perf_counter()
+    if use_cache:
+        cached = models.get("llm_cache").get(model_name, prompt)
+        if cached is not None:
+            elapsed = time.perf_counter() - start
+            STREAM_METRICS.append({"name": metric_name, "ttft": elapsed, "total": elapsed, "cached": True})
+            yield cached
+            return
+
+    ttft = None
+    parts = []
+    for chunk in get_model(model_name).generate_content(prompt, stream=True, **kwargs):
+        text = getattr(chunk, "text", "") or ""
+        if not text:
+            continue
+        if ttft is None:
+            ttft = time.perf_counter() - start
+        parts.append(text)
+        yield text
+
+    total = time.perf_counter() - start
+    STREAM_METRICS.append({"name": metric_name, "ttft": ttft if ttft is not None else total,
+                           "total": total, "cached": False})
+    if use_cache:
+        models.get("llm_cache").put(model_name, prompt, "".join(parts).strip())
 
 
 # ==============================
@@ -36,8 +160,7 @@ def generate_interview_questions(job: dict, num_questions: int = 5) -> list:
     """
 
     try:
-        response = model.generate_content(prompt)
-        questions_text = response.text.strip()
+        questions_text = generate_text(prompt)
         questions = [q.strip("1234567890. ") for q in questions_text.split("\n") if q.strip()]
         return questions[:num_questions]
     except Exception as e:
@@ -66,37 +189,43 @@ def summarize_skills(matched, missing, job_title):
     """
 
     try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        return generate_text(prompt)
     except Exception as e:
         return f"⚠ Error summarizing skills: {e}"
-def generate_answer(question: str) -> str:
-    """
-    Generate a structured interview-style answer to a question.
-    """
-    prompt = f"""
+def _answer_prompt(question: str) -> str:
+    return f"""
     You are an expert interviewer assistant.
     Provide a clear, structured, and confident interview answer to the following question:
 
     {question}
     """
 
+
+def generate_answer(question: str) -> str:
+    """
+    Generate a structured interview-style answer to a question.
+    """
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        return generate_text(_answer_prompt(question))
     except Exception as e:
         return f"⚠ Error generating answer: {e}"
 
 
+def generate_answer_stream(question: str):
+    """
+    Streaming variant of generate_answer: yields text chunks as they arrive.
+    """
+    try:
+        yield from generate_text_stream(_answer_prompt(question), metric_name="answer")
+    except Exception as e:
+        yield f"⚠ Error generating answer: {e}"
+
+
 # ==============================
 # 📧 Generate Cold Email
 # ==============================
-def generate_cold_email(resume_path: str, job_title: str, company: str, skills: list) -> str:
-    """
-    Generate a personalized cold email for a job application.
-    """
-    prompt = f"""
+def _cold_email_prompt(resume_path: str, job_title: str, company: str, skills: list) -> str:
+    return f"""
     You are an AI career assistant.
     Write a short, personalized cold email to apply for the role of "{job_title}" at {company}.
     The candidate’s resume is available at: {resume_path}.
@@ -104,13 +233,29 @@ def generate_cold_email(resume_path: str, job_title: str, company: str, skills:
     Keep it professional, concise (under 150 words), and end with a polite call to action.
     """
 
+
+def generate_cold_email(resume_path: str, job_title: str, company: str, skills: list) -> str:
+    """
+    Generate a personalized cold email for a job application.
+    """
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        return generate_text(_cold_email_prompt(resume_path, job_title, company, skills))
     except Exception as e:
         return f"⚠ Error generating cold email: {e}"
 
 
+def generate_cold_email_stream(resume_path: str, job_title: str, company: str, skills: list):
+    """
+    Streaming variant of generate_cold_email: yields text chunks as they arrive.
+    """
+    try:
+        yield from generate_text_stream(
+            _cold_email_prompt(resume_path, job_title, company, skills), metric_name="cold_email"
+        )
+    except Exception as e:
+        yield f"⚠ Error generating cold email: {e}"
+
+
 # ==============================
 # 📘 Suggest Skill Improvements
 # ==============================
@@ -134,7 +279,123 @@ def suggest_skill_improvements(missing_skills: list) -> str:
     """
 
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        return generate_text(prompt)
     except Exception as e:
         return f"⚠ Error suggesting skill improvements: {e}"
+
+
+# ==============================
+# 📦 Batch Insights for Many Jobs
+# ==============================
+BATCH_JOBS_PER_PROMPT = int(os.getenv("BATCH_JOBS_PER_PROMPT", "10"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))  # batch prompts in flight at once
+
+
+def _parse_json_response(text: str):
+    """Parse a JSON array/object out of a model reply, tolerating code fences and surrounding prose."""
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    for open_ch, close_ch in (("[", "]"), ("{", "}")):
+        start, end = text.find(open_ch), text.rfind(close_ch)
+        if start != -1 and end > start:
+            try:
+                return json.loads(text[start:end + 1])
+            except ValueError:
+                continue
+    return None
+
+
+def _valid_insight(entry) -> bool:
+    return (
+        isinstance(entry, dict)
+        and isinstance(entry.get("summary"), str) and entry["summary"].strip()
+        and isinstance(entry.get("questions"), list) and entry["questions"]
+        and isinstance(entry.get("learning_path"), str)
+    )
+
+
+def _insights_for_chunk(jobs: list, num_questions: int, model_name: str = MODEL_NAME, timeout: float = None) -> dict:
+    profiles = "\n".join(
+        f"- id: {i}\n"
+        f"  title: {job.get('title')}\n"
+        f"  company: {job.get('company')}\n"
+        f"  required skills: {', '.join(job.get('skills', []))}\n"
+        f"  matched skills: {', '.join(job.get('matched', []))}\n"
+        f"  missing skills: {', '.join(job.get('missing', []))}"
+        for i, job in enumerate(jobs)
+    )
+    prompt = f"""
+    You are an AI career analyst and expert technical interviewer.
+    For EACH job profile below produce:
+    - "summary": 2–3 lines on how well the candidate fits and what to improve.
+    - "questions": a list of {num_questions} interview questions (conceptual and practical).
+    - "learning_path": short bullet points with resources to learn the missing skills.
+
+    Respond with ONLY a JSON array, one object per job, each with keys
+    "id", "summary", "questions", "learning_path". Do not add any other text.
+
+    {profiles}
+    """
+
+    kwargs = {"request_options": {"timeout": timeout}} if timeout else {}
+    parsed = _parse_json_response(generate_text(prompt, model_name, **kwargs))
+    if isinstance(parsed, dict):
+        parsed = parsed.get("jobs") or parsed.get("results") or []
+    by_id = {}
+    for entry in parsed or []:
+        if not _valid_insight(entry):
+            continue
+        try:
+            idx = int(entry.get("id"))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= idx < len(jobs):
+            by_id[idx] = {
+                "summary": entry["summary"].strip(),
+                "questions": [str(q).strip() for q in entry["questions"]][:num_questions],
+                "learning_path": entry["learning_path"].strip(),
+            }
+    return by_id
+
+
+def generate_job_insights_batch(jobs: list, num_questions: int = 5, fallback: bool = True,
+                                model_name: str = MODEL_NAME, timeout: float = None,
+                                max_workers: int = BATCH_MAX_CONCURRENCY) -> list:
+    """
+    Generate summary, interview questions and learning path for many jobs,
+    sending up to BATCH_JOBS_PER_PROMPT jobs per Gemini request; the
+    requests run concurrently (max_workers at a time), each with `timeout`.
+
+    jobs: match results with 'title', 'company', 'skills', 'matched', 'missing'.
+    Returns one {'summary', 'questions', 'learning_path'} dict per job, in order.
+    Jobs missing from (or malformed in) the JSON reply are generated with the
+    per-job helpers, or left as None when fallback=False.
+    """
+    insights = [None] * len(jobs)
+    starts = list(range(0, len(jobs), BATCH_JOBS_PER_PROMPT))
+    if starts:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(starts)))) as pool:
+            futures = {
+                start: pool.submit(_insights_for_chunk, jobs[start:start + BATCH_JOBS_PER_PROMPT],
+                                   num_questions, model_name, timeout)
+                for start in starts
+            }
+            for start, future in futures.items():
+                try:
+                    for idx, entry in future.result().items():
+                        insights[start + idx] = entry
+                except Exception as e:
+                    print(f"⚠ Batch insight generation failed, falling back per job: {e}")
+
+    if fallback:
+        for i, job in enumerate(jobs):
+            if insights[i] is None:
+                insights[i] = {
+                    "summary": summarize_skills(job.get("matched", []), job.get("missing", []), job.get("title")),
+                    "questions": generate_interview_questions(job, num_questions),
+                    "learning_path": suggest_skill_improvements(job.get("missing", [])),
+                }
+    return insights
@@ -0,0 +1,81 @@
+import json
+import threading
+from datetime import datetime
+from backend.database import get_db
+
+# ================================
+# Persisted job skill extraction
+# ================================
+# Skills are extracted once when a posting is ingested and stored here,
+# keyed by (Job URL, content hash). Search-time matching then only needs
+# set operations.
+MEMORY_SIZE = 4096
+
+
+class JobSkillStore:
+    def __init__(self):
+        self._memory = {}
+        self._lock = threading.Lock()
+        db = get_db()
+        try:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS job_skills (
+                    url TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    title TEXT,
+                    skills TEXT NOT NULL,
+                    extracted_at TEXT,
+                    PRIMARY KEY (url, content_hash)
+                )
+            """)
+            db.commit()
+        finally:
+            db.close()
+
+    def get_many(self, keys: list) -> dict:
+        """keys: [(url, content_hash)]. Returns {key: skills} for the keys already stored."""
+        found = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    found[key] = self._memory[key]
+                else:
+                    missing.append(key)
+        if not missing:
+            return found
+
+        db = get_db()
+        try:
+            for url, chash in missing:
+                row = db.execute(
+                    "SELECT skills FROM job_skills WHERE url = ? AND content_hash = ?", (url, chash)
+                ).fetchone()
+                if row:
+                    found[(url, chash)] = json.loads(row[0])
+        finally:
+            db.close()
+        self._remember({k: found[k] for k in missing if k in found})
+        return found
+
+    def put_many(self, rows: list):
+        """rows: [(url, content_hash, title, skills)]"""
+        if not rows:
+            return
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        db = get_db()
+        try:
+            db.executemany(
+                "INSERT OR REPLACE INTO job_skills (url, content_hash, title, skills, extracted_at) VALUES (?, ?, ?, ?, ?)",
+                [(url, chash, title, json.dumps(skills), now) for url, chash, title, skills in rows],
+            )
+            db.commit()
+        finally:
+            db.close()
+        self._remember({(url, chash): skills for url, chash, _, skills in rows})
+
+    def _remember(self, entries: dict):
+        with self._lock:
+            if len(self._memory) + len(entries) > MEMORY_SIZE:
+                self._memory.clear()
+            self._memory.update(entries)
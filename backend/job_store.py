@@ -0,0 +1,162 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from backend.database import get_db
+
+# ================================
+# Local job store (replaces data/jobs_cache.json)
+# ================================
+# Append-only: postings are deduplicated by Job URL, or by a hash of their
+# content when they have no URL, and are never rewritten. Each posting
+# remembers which search keywords/locations returned it, so lookups by
+# keyword, location and fetch time hit an index instead of parsing a file.
+
+
+def posting_hash(job: dict) -> str:
+    """Identity of a posting's content; the one posting hash used across the app."""
+    fields = ("Job Title", "Company", "Company Name", "Location", "Description", "Skills/Tags")
+    return hashlib.sha256("\x1f".join(str(job.get(f) or "") for f in fields).encode("utf-8")).hexdigest()
+
+
+def _split_keywords(keywords: str) -> list:
+    return sorted({k.strip().lower() for k in (keywords or "").split(",") if k.strip()})
+
+
+class JobStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        db = get_db()
+        try:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT UNIQUE,
+                    content_hash TEXT NOT NULL UNIQUE,
+                    title TEXT,
+                    company TEXT,
+                    location TEXT,
+                    fetched_at TEXT NOT NULL,
+                    payload TEXT NOT NULL
+                )
+            """)
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS job_searches (
+                    job_id INTEGER NOT NULL,
+                    keyword TEXT NOT NULL,
+                    search_location TEXT NOT NULL,
+                    fetched_at TEXT NOT NULL,
+                    PRIMARY KEY (keyword, search_location, job_id)
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_fetched_at ON jobs (fetched_at)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_job_searches_location ON job_searches (search_location, fetched_at)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_job_searches_keyword ON job_searches (keyword, fetched_at)")
+            db.commit()
+        finally:
+            db.close()
+
+    def append(self, jobs: list, keywords: str = "", location: str = "") -> int:
+        """Store new postings; known ones only gain the keyword/location link. Returns the number added."""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        kws = _split_keywords(keywords) or [""]
+        loc = (location or "").strip().lower()
+        added = 0
+        with self._lock:
+            db = get_db()
+            try:
+                for job in jobs:
+                    url = job.get("Job URL") or job.get("Link") or None
+                    chash = posting_hash(job)
+                    row = db.execute(
+                        "SELECT id FROM jobs WHERE url = ? OR content_hash = ?", (url, chash)
+                    ).fetchone()
+                    if row:
+                        job_id = row[0]
+                    else:
+                        job_id = db.execute(
+                            "INSERT INTO jobs (url, content_hash, title, company, location, fetched_at, payload) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (url, chash, job.get("Job Title"), job.get("Company") or job.get("Company Name"),
+                             job.get("Location"), now, json.dumps(job, ensure_ascii=False)),
+                        ).lastrowid
+                        added += 1
+                    db.executemany(
+                        "INSERT OR IGNORE INTO job_searches (job_id, keyword, search_location, fetched_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        [(job_id, kw, loc, now) for kw in kws],
+                    )
+                db.commit()
+            finally:
+                db.close()
+        return added
+
+    def page(self, limit: int = 20, before_id: int = None, keyword: str = None,
+             location: str = None, since: str = None) -> list:
+        """
+        Newest postings first, `limit` at a time. Pass the smallest '_id' of
+        the previous page as before_id to get the next one. Filters: search
+        keyword, search location, and fetched_at >= since ('YYYY-mm-dd HH:MM:SS').
+        """
+        where, params = [], []
+        if keyword or location:
+            sub, sub_params = [], []
+            if keyword:
+                sub.append("keyword = ?")
+                sub_params.append(keyword.strip().lower())
+            if location:
+                sub.append("search_location = ?")
+                sub_params.append(location.strip().lower())
+            where.append(f"id IN (SELECT job_id FROM job_searches WHERE {' AND '.join(sub)})")
+            params += sub_params
+        if since:
+            where.append("fetched_at >= ?")
+            params.append(since)
+        if before_id is not None:
+            where.append("id < ?")
+            params.append(before_id)
+        sql = "SELECT id, payload FROM jobs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+
+        db = get_db()
+        try:
+            rows = db.execute(sql, params).fetchall()
+        finally:
+            db.close()
+        return [dict(json.loads(payload), _id=job_id) for job_id, payload in rows]
+
+    def iter_all(self, batch_size: int = 500):
+        """Every stored posting, newest first, read one page at a time."""
+        before = None
+        while True:
+            page = self.page(limit=batch_size, before_id=before)
+            if not page:
+                return
+            yield from page
+            before = page[-1]["_id"]
+
+    def count(self) -> int:
+        db = get_db()
+        try:
+            return db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        finally:
+            db.close()
+
+    def migrate_json_cache(self, path: str) -> int:
+        """One-time import of an old jobs_cache.json; the file is renamed to *.migrated afterwards."""
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                jobs = json.load(fh)
+        except ValueError as e:
+            print(f"⚠️ Could not migrate {path}: {e}")
+            return 0
+        added = self.append(jobs if isinstance(jobs, list) else [])
+        os.replace(path, path + ".migrated")
+        print(f"✅ Migrated {added} jobs from {path}")
+        return added
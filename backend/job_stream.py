@@ -0,0 +1,105 @@
+import queue
+import threading
+
+# ================================
+# Memory-bounded streaming ingestion of Apify datasets
+# ================================
+DATASET_PAGE_SIZE = 100   # items requested per list_items() call
+PIPELINE_BATCH_SIZE = 32  # postings per skill-extraction batch
+PIPELINE_QUEUE_SIZE = 4   # batches buffered between download and extraction
+
+_DONE = object()
+
+
+def iter_dataset_items(dataset_client, max_items: int = None, page_size: int = DATASET_PAGE_SIZE):
+    """
+    Yield items from an Apify dataset one page at a time, stopping after
+    max_items. Only one page is held in memory. dataset_client is anything
+    with list_items(offset=, limit=) returning an object with `.items`
+    (e.g. ApifyClient(...).dataset(id) or LocalDatasetClient).
+    """
+    offset = 0
+    while max_items is None or offset < max_items:
+        limit = page_size if max_items is None else min(page_size, max_items - offset)
+        items = dataset_client.list_items(offset=offset, limit=limit).items
+        if not items:
+            return
+        yield from items
+        offset += len(items)
+        if len(items) < limit:
+            return
+
+
+class LocalDatasetClient:
+    """In-memory stand-in for an Apify dataset client (offline runs and tests)."""
+
+    class _Page:
+        def __init__(self, items, offset, limit, total):
+            self.items = items
+            self.offset = offset
+            self.limit = limit
+            self.total = total
+            self.count = len(items)
+
+    def __init__(self, items: list):
+        self._items = list(items)
+        self.calls = 0
+
+    def list_items(self, offset: int = 0, limit: int = None, **kwargs):
+        self.calls += 1
+        end = len(self._items) if limit is None else offset + limit
+        return self._Page(self._items[offset:end], offset, limit, len(self._items))
+
+    def iterate_items(self, offset: int = 0, limit: int = None, **kwargs):
+        end = len(self._items) if limit is None else offset + limit
+        yield from self._items[offset:end]
+
+
+def pipeline_batches(items, process, batch_size: int = PIPELINE_BATCH_SIZE, queue_size: int = PIPELINE_QUEUE_SIZE):
+    """
+    Read `items` (any iterable, typically iter_dataset_items) on a background
+    thread and hand batches through a bounded queue to `process`, so later
+    pages download while earlier ones are processed. Yields
+    (batch, process(batch)) in order. When the consumer falls behind, the
+    download blocks instead of buffering more than queue_size batches.
+    Errors raised while reading are re-raised in the consumer.
+    """
+    q = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def _put(entry) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce():
+        batch = []
+        try:
+            for item in items:
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    if not _put(batch):
+                        return
+                    batch = []
+            if batch:
+                _put(batch)
+            _put(_DONE)
+        except Exception as e:
+            _put(e)
+
+    producer = threading.Thread(target=_produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            entry = q.get()
+            if entry is _DONE:
+                return
+            if isinstance(entry, Exception):
+                raise entry
+            yield entry, process(entry)
+    finally:
+        stop.set()
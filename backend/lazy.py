@@ -0,0 +1,40 @@
+import threading
+
+# ================================
+# Lazy, memoized values
+# ================================
+class LazyValue:
+    """
+    Handle to a value that is computed on first read and memoized.
+    Used for expensive LLM fields that the UI may never open.
+    """
+
+    def __init__(self, compute):
+        self._compute = compute
+        self._lock = threading.Lock()
+        self._done = False
+        self._value = None
+
+    @property
+    def resolved(self) -> bool:
+        return self._done
+
+    def get(self):
+        if not self._done:
+            with self._lock:
+                if not self._done:
+                    self._value = self._compute()
+                    self._done = True
+                    self._compute = None
+        return self._value
+
+    def __str__(self):
+        return str(self.get())
+
+    def __repr__(self):
+        return f"LazyValue({self._value!r})" if self._done else "LazyValue(<pending>)"
+
+
+def resolve(value):
+    """Return value itself, or its computed value if it is a LazyValue."""
+    return value.get() if isinstance(value, LazyValue) else value
@@ -0,0 +1,104 @@
+import re
+import time
+import hashlib
+import threading
+from backend.database import get_db
+
+# ================================
+# Persistent LLM response cache
+# ================================
+# Key: SHA-256 of model name + whitespace-normalized prompt.
+# Entries expire after `ttl` seconds; once the table holds more than
+# `max_entries` rows the least recently used ones are evicted.
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 50_000
+EVICT_EVERY = 100  # puts between size checks
+
+
+def normalize_prompt(prompt: str) -> str:
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+def cache_key(model_name: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model_name}\n{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        db = get_db()
+        try:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used)")
+            db.commit()
+        finally:
+            db.close()
+
+    def get(self, model_name: str, prompt: str):
+        key = cache_key(model_name, prompt)
+        now = time.time()
+        db = get_db()
+        try:
+            row = db.execute(
+                "SELECT response FROM llm_cache WHERE key = ? AND created_at > ?", (key, now - self.ttl)
+            ).fetchone()
+            if row:
+                db.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+                db.commit()
+        finally:
+            db.close()
+
+        with self._lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return row[0] if row else None
+
+    def put(self, model_name: str, prompt: str, response: str):
+        now = time.time()
+        db = get_db()
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (cache_key(model_name, prompt), model_name, response, now, now),
+            )
+            with self._lock:
+                self._puts += 1
+                evict = self._puts % EVICT_EVERY == 0
+            if evict:
+                self._evict(db, now)
+            db.commit()
+        finally:
+            db.close()
+
+    def _evict(self, db, now: float):
+        db.execute("DELETE FROM llm_cache WHERE created_at <= ?", (now - self.ttl,))
+        excess = db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            db.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
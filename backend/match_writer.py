@@ -0,0 +1,68 @@
+import queue
+import threading
+
+# ================================
+# Batched, transactional persistence of match results
+# ================================
+WRITER_QUEUE_SIZE = 64  # pending write batches before submit() applies backpressure
+
+
+def write_batch(get_conn, statements: list):
+    """
+    Run [(sql, rows)] with executemany in a single transaction: either every
+    row of every statement is stored or none is.
+    """
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        try:
+            for sql, rows in statements:
+                if rows:
+                    cur.executemany(sql, rows)
+        finally:
+            cur.close()
+        conn.commit()
+    finally:
+        conn.close()
+
+
+class MatchWriter:
+    """
+    Background writer: submit() queues a batch of statements and returns
+    immediately; a single daemon thread writes each batch with write_batch().
+    The queue is bounded, so a stalled database slows producers down rather
+    than buffering without limit.
+    """
+
+    def __init__(self, get_conn, queue_size: int = WRITER_QUEUE_SIZE):
+        self._get_conn = get_conn
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.errors = 0
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            statements = self._queue.get()
+            try:
+                write_batch(self._get_conn, statements)
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ Failed to persist match batch: {e}")
+            finally:
+                self._queue.task_done()
+
+    def submit(self, statements: list, timeout: float = None):
+        """Queue [(sql, rows)] for one transaction. Blocks (up to timeout) when the queue is full."""
+        self._ensure_started()
+        self._queue.put(statements, timeout=timeout)
+
+    def flush(self):
+        """Wait until every submitted batch has been written."""
+        self._queue.join()
@@ -1,30 +1,46 @@
-import spacy
+from backend import models
 
-# Load your trained spaCy skill NER model
+# Your trained spaCy skill NER model, loaded on first use
 model_path = r"D:\L&T Projects\Career Captain\backend\it_skill_model"
 # ================================
-nlp = spacy.load(model_path)
+
+def _load_spacy():
+    import spacy
+    return spacy.load(model_path)
+
+models.register("spacy_skills", _load_spacy)
+
+def get_nlp():
+    return models.get("spacy_skills")
 
 def extract_skills(text):
     """Use spaCy NER to extract skills from text."""
-    doc = nlp(text)
+    doc = get_nlp()(text)
     skills = [ent.text.lower().strip() for ent in doc.ents if ent.label_ == "SKILL"]
     return set(skills)
 
-def match_resume_to_job(resume_text, job_data):
+def match_resume_to_job(resume_text, job_data, semantic=False, threshold=None):
     """
     Match skills extracted from resume with skills in job posting.
     
     Args:
         resume_text (str): Raw text from resume.
         job_data (dict): {'skills': list of job skills}
+        semantic (bool): Also match near-synonyms using skill embeddings.
+        threshold (float): Minimum cosine similarity for a semantic match.
     
     Returns:
         dict: {'score', 'matched_skills', 'missing_skills'}
+              (+ 'similarities' when semantic=True)
     """
     # Extract skills from resume using spaCy
     resume_skills = extract_skills(resume_text)
 
+    if semantic:
+        from backend.semantic import semantic_match, SEMANTIC_THRESHOLD
+        return semantic_match(list(resume_skills), job_data.get("skills", []),
+                              threshold=SEMANTIC_THRESHOLD if threshold is None else threshold)
+
     # Prepare job skills
     job_skills = set([s.lower().strip() for s in job_data.get("skills", [])])
 
@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+import threading
+import subprocess
+
+# ================================
+# Lazy model registry
+# ================================
+# Heavy models (transformers, spaCy, Gemini clients) are registered with a
+# loader and only built the first time somebody asks for them.
+_LOADERS = {}
+_MODELS = {}
+_LOCK = threading.RLock()
+
+
+def register(name: str, loader):
+    """Register a zero-argument loader for a model. Nothing is loaded yet."""
+    with _LOCK:
+        _LOADERS[name] = loader
+
+
+def get(name: str):
+    """Return the model registered under name, loading it on first use."""
+    if name in _MODELS:
+        return _MODELS[name]
+    with _LOCK:
+        if name not in _MODELS:
+            if name not in _LOADERS:
+                raise KeyError(f"No model registered under '{name}'")
+            start = time.perf_counter()
+            _MODELS[name] = _LOADERS[name]()
+            print(f"✅ Loaded '{name}' in {time.perf_counter() - start:.1f}s")
+        return _MODELS[name]
+
+
+def is_registered(name: str) -> bool:
+    return name in _LOADERS
+
+
+def is_loaded(name: str) -> bool:
+    return name in _MODELS
+
+
+def unload(name: str):
+    """Drop a loaded model so the next get() rebuilds it."""
+    with _LOCK:
+        _MODELS.pop(name, None)
+
+
+def warm_up(*names, background: bool = False):
+    """
+    Explicitly load models ahead of the first request.
+    With no names, every registered model is loaded.
+    """
+    def _load():
+        for name in names or list(_LOADERS):
+            try:
+                get(name)
+            except Exception as e:
+                print(f"⚠️ Warm-up failed for '{name}': {e}")
+
+    if background:
+        t = threading.Thread(target=_load, daemon=True)
+        t.start()
+        return t
+    _load()
+
+
+# ================================
+# Import-time budget
+# ================================
+IMPORT_TIME_BUDGET = float(os.getenv("IMPORT_TIME_BUDGET", "2.0"))  # seconds per module
+STARTUP_MODULES = ["backend.resume_job_parser", "backend.gemini_helper", "backend.matching", "main"]
+
+
+def measure_import_time(module: str) -> float:
+    """Import module in a fresh interpreter and return the wall time in seconds."""
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {module}; "
+        "print(time.perf_counter() - t)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def check_import_budget(modules=None, budget: float = IMPORT_TIME_BUDGET) -> bool:
+    ok = True
+    for module in modules or STARTUP_MODULES:
+        seconds = measure_import_time(module)
+        within = seconds <= budget
+        ok = ok and within
+        print(f"{'✅' if within else '❌'} {module}: {seconds:.2f}s (budget {budget:.2f}s)")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_import_budget(sys.argv[1:] or None) else 1)
@@ -0,0 +1,93 @@
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from backend.database import get_db
+
+# ================================
+# Content-addressed cache for parsed resumes
+# ================================
+# Key: SHA-256 of the PDF bytes. Value: the parse_resume() output.
+# Two tiers: an in-process LRU and a SQLite table shared by all processes.
+# Entries written by a different extractor version are ignored and purged.
+MEMORY_SIZE = 128
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResumeCache:
+    def __init__(self, version: str, memory_size: int = MEMORY_SIZE):
+        self.version = version
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._init_table()
+
+    def _init_table(self):
+        db = get_db()
+        try:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS resume_cache (
+                    content_hash TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at TEXT,
+                    PRIMARY KEY (content_hash, version)
+                )
+            """)
+            # Invalidate everything produced by another model / parser version
+            db.execute("DELETE FROM resume_cache WHERE version != ?", (self.version,))
+            db.commit()
+        finally:
+            db.close()
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return dict(self._memory[key])
+
+        db = get_db()
+        try:
+            row = db.execute(
+                "SELECT payload FROM resume_cache WHERE content_hash = ? AND version = ?",
+                (key, self.version),
+            ).fetchone()
+        finally:
+            db.close()
+        if row is None:
+            return None
+
+        value = json.loads(row[0])
+        self._remember(key, value)
+        return dict(value)
+
+    def put(self, key: str, value: dict):
+        self._remember(key, value)
+        db = get_db()
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO resume_cache (content_hash, version, payload, created_at) VALUES (?, ?, ?, ?)",
+                (key, self.version, json.dumps(value), datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def insert_statement(self, items: list):
+        """(sql, rows) storing [(key, value)] in one executemany, for callers batching their own transaction."""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return (
+            "INSERT OR REPLACE INTO resume_cache (content_hash, version, payload, created_at) VALUES (?, ?, ?, ?)",
+            [(key, self.version, json.dumps(value), now) for key, value in items],
+        )
+
+    def _remember(self, key: str, value: dict):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
@@ -1,27 +1,60 @@
-
-
+import os
 import re
 import fitz  # PyMuPDF
 import requests
 from bs4 import BeautifulSoup
-from transformers import AutoTokenizer, AutoModelForTokenClassification, pipeline
+from backend import models
+from backend.skill_matcher import SkillMatcher, load_taxonomy
+from backend.resume_cache import ResumeCache, content_hash
+from backend.job_skill_store import JobSkillStore
+from backend.job_store import posting_hash
+from backend.job_stream import pipeline_batches
+from backend.skill_index import SkillIndex
 
 # ================================
-# Load Hugging Face Skill Extraction Model (with fallback)
+# Hugging Face Skill Extraction Model (with fallback), loaded on first use
 # ================================
-try:
-    MODEL_NAME = "AI4Bharat/SkillNER-BERT"  # public fine-tuned for skills
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModelForTokenClassification.from_pretrained(MODEL_NAME)
-    print("✅ Loaded fine-tuned SkillNER-BERT model.")
-except Exception as e:
-    print(f"⚠️ SkillNER model failed to load: {e}")
-    print("➡️ Falling back to general-purpose NER model (dslim/bert-base-NER).")
-    MODEL_NAME = "dslim/bert-base-NER"
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModelForTokenClassification.from_pretrained(MODEL_NAME)
+MODEL_NAME = "AI4Bharat/SkillNER-BERT"  # public fine-tuned for skills
+FALLBACK_MODEL_NAME = "dslim/bert-base-NER"
+
+# Model _load_ner settled on: MODEL_NAME, FALLBACK_MODEL_NAME or "none".
+_ner_loaded = {"name": None}
+
+def _load_ner():
+    try:
+        from transformers import AutoTokenizer, AutoModelForTokenClassification, pipeline
+
+        try:
+            name = MODEL_NAME
+            tokenizer = AutoTokenizer.from_pretrained(name)
+            model = AutoModelForTokenClassification.from_pretrained(name)
+            print("✅ Loaded fine-tuned SkillNER-BERT model.")
+        except Exception as e:
+            print(f"⚠️ SkillNER model failed to load: {e}")
+            print(f"➡️ Falling back to general-purpose NER model ({FALLBACK_MODEL_NAME}).")
+            name = FALLBACK_MODEL_NAME
+            tokenizer = AutoTokenizer.from_pretrained(name)
+            model = AutoModelForTokenClassification.from_pretrained(name)
+
+        ner = pipeline("ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple")
+    except Exception as e:
+        # Remembered like a loaded model, so later calls do not retry the download
+        print(f"⚠️ No NER model could be loaded, using dictionary matching only: {e}")
+        name, tokenizer, ner = "none", None, None
 
-ner_pipeline = pipeline("ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple")
+    _ner_loaded["name"] = name
+    if name != MODEL_NAME:
+        # The resume cache was versioned for MODEL_NAME; rebuild it for this model
+        models.unload("resume_cache")
+    return {"name": name, "tokenizer": tokenizer, "pipeline": ner}
+
+models.register("ner", _load_ner)
+
+def get_tokenizer():
+    return models.get("ner")["tokenizer"]
+
+def get_ner_pipeline():
+    return models.get("ner")["pipeline"]
 
 # ================================
 # Predefined skill dictionary (fallback support)
@@ -34,6 +67,21 @@ SKILLS_DICT = [
     "Hadoop", "Power BI", "Tableau", "Git", "MLOps", "FastAPI"
 ]
 
+# Optional larger taxonomy, one skill per line, merged with SKILLS_DICT
+SKILLS_FILE = os.getenv("SKILLS_FILE")
+
+def _load_skill_matcher():
+    skills = list(SKILLS_DICT)
+    if SKILLS_FILE:
+        skills += load_taxonomy(SKILLS_FILE)
+    return SkillMatcher(skills)
+
+models.register("skill_matcher", _load_skill_matcher)
+
+def get_skill_matcher() -> SkillMatcher:
+    """Shared dictionary matcher, compiled once per process."""
+    return models.get("skill_matcher")
+
 # ================================
 # Helper: Clean text
 # ================================
@@ -45,25 +93,104 @@ def clean_text(text: str) -> str:
 # ================================
 # Extract skills using hybrid NER + dictionary
 # ================================
+NER_BATCH_SIZE = 16
+NER_WINDOW_TOKENS = 400   # stays under BERT's 512-token limit once special tokens are added
+NER_WINDOW_OVERLAP = 64   # tokens shared by neighbouring windows so edge entities are seen whole
+NER_EDGE_CHARS = 2        # entities this close to an inner window edge may be cut off
+
+def _ner_words(ner_results: list) -> list:
+    return [
+        r["word"].replace("##", "").strip()
+        for r in ner_results if r["entity_group"] in ["MISC", "ORG", "SKILL"]
+    ]
+
+def _merge_skills(text: str, ner_skills: list) -> list:
+    # Fallback dictionary matching (single linear pass, word-boundary aware)
+    dict_skills = get_skill_matcher().find(text)
+
+    # Merge & deduplicate
+    return list(set([s.title() for s in ner_skills + dict_skills]))
+
+def _text_windows(text: str) -> list:
+    """
+    Split text into overlapping token windows.
+    Returns a list of (char_start, char_end) spans into the original text.
+    """
+    offsets = get_tokenizer()(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+    if len(offsets) <= NER_WINDOW_TOKENS:
+        return [(0, len(text))]
+
+    spans = []
+    step = NER_WINDOW_TOKENS - NER_WINDOW_OVERLAP
+    for first in range(0, len(offsets), step):
+        last = min(first + NER_WINDOW_TOKENS, len(offsets)) - 1
+        spans.append((offsets[first][0], offsets[last][1]))
+        if last == len(offsets) - 1:
+            break
+    return spans
+
+def _ner_skills_batch(texts: list, batch_size: int = NER_BATCH_SIZE) -> list:
+    """
+    Run NER over every window of every text in one batched pipeline call,
+    then merge the entities back per text, dropping duplicates from overlaps.
+    """
+    if get_ner_pipeline() is None:
+        return [[] for _ in texts]
+
+    windows = []  # (text index, char_start, char_end)
+    for i, text in enumerate(texts):
+        if text:
+            windows.extend((i, start, end) for start, end in _text_windows(text))
+
+    ner_per_text = [[] for _ in texts]
+    if not windows:
+        return ner_per_text
+
+    outputs = get_ner_pipeline()([texts[i][start:end] for i, start, end in windows], batch_size=batch_size)
+    seen = [set() for _ in texts]
+    for (i, start, end), ner_results in zip(windows, outputs):
+        kept = []
+        for r in ner_results:
+            # Entities touching an inner window edge may be truncated; the
+            # overlapping neighbour window sees them whole.
+            if start > 0 and r["start"] < NER_EDGE_CHARS:
+                continue
+            if end < len(texts[i]) and r["end"] > (end - start) - NER_EDGE_CHARS:
+                continue
+            kept.append(r)
+        for word in _ner_words(kept):
+            if word and word.lower() not in seen[i]:
+                seen[i].add(word.lower())
+                ner_per_text[i].append(word)
+    return ner_per_text
+
 def extract_skills(text: str) -> list:
     if not text:
         return []
     try:
-        ner_results = ner_pipeline(text[:2000])  # limit text length for performance
-        ner_skills = [
-            r["word"].replace("##", "").strip()
-            for r in ner_results if r["entity_group"] in ["MISC", "ORG", "SKILL"]
-        ]
+        ner_skills = _ner_skills_batch([text])[0]
     except Exception as e:
         print(f"⚠️ NER extraction failed: {e}")
         ner_skills = []
 
-    # Fallback dictionary matching
-    dict_skills = [s for s in SKILLS_DICT if s.lower() in text.lower()]
+    return _merge_skills(text, ner_skills)
 
-    # Merge & deduplicate
-    combined = list(set([s.title() for s in ner_skills + dict_skills]))
-    return combined
+# ================================
+# Batched skill extraction for many texts
+# ================================
+def extract_skills_batch(texts: list, batch_size: int = NER_BATCH_SIZE) -> list:
+    """
+    Same as extract_skills, but feeds all texts through the NER pipeline in
+    padded batches. Returns one skill list per input text, in order.
+    """
+    texts = [t or "" for t in texts]
+    try:
+        ner_per_text = _ner_skills_batch(texts, batch_size=batch_size)
+    except Exception as e:
+        print(f"⚠️ Batched NER extraction failed: {e}")
+        ner_per_text = [[] for _ in texts]
+
+    return [_merge_skills(t, ner) if t else [] for t, ner in zip(texts, ner_per_text)]
 
 # ================================
 # Extract contact info (email, phone)
@@ -76,14 +203,57 @@ def extract_contact_info(text: str) -> dict:
 # ================================
 # Parse resume from PDF
 # ================================
-def parse_resume(file_path: str) -> dict:
-    pdf = fitz.open(file_path)
-    text = " ".join(page.get_text("text") for page in pdf)
-    pdf.close()
-    text = clean_text(text)
-    skills = extract_skills(text)
-    contact = extract_contact_info(text)
+# Bump when parse_resume output changes so cached results are invalidated.
+PARSER_VERSION = "1"
+# Resumes rarely run past a few pages; anything beyond these budgets is not read.
+RESUME_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "10"))
+RESUME_MAX_CHARS = int(os.getenv("RESUME_MAX_CHARS", "50000"))
+
+_versions = {}  # NER model name -> extractor version
+
+def extractor_version() -> str:
+    """
+    Identifies everything that affects parse_resume output: parser, budgets,
+    the NER model (the one _load_ner settled on, or MODEL_NAME while it has
+    not run yet) and the contents of the taxonomy. Memoized, and never loads
+    the NER model itself, so cache lookups stay cheap.
+    """
+    ner = _ner_loaded["name"] or MODEL_NAME
+    if ner not in _versions:
+        taxonomy = get_skill_matcher().digest
+        _versions[ner] = f"{PARSER_VERSION}|{RESUME_MAX_PAGES}|{RESUME_MAX_CHARS}|{ner}|{taxonomy}"
+    return _versions[ner]
+
+models.register("resume_cache", lambda: ResumeCache(extractor_version()))
 
+def iter_page_texts(data, max_pages: int = RESUME_MAX_PAGES):
+    """
+    Yield the text of each page of a PDF given as bytes or a memoryview,
+    loading one page at a time. Pages without fonts (scans, images) cannot
+    hold extractable text and are skipped without running text extraction.
+    """
+    pdf = fitz.open(stream=data, filetype="pdf")
+    try:
+        for number in range(min(pdf.page_count, max_pages)):
+            page = pdf.load_page(number)
+            if page.get_fonts():
+                yield page.get_text("text")
+    finally:
+        pdf.close()
+
+def pdf_text(data, max_pages: int = RESUME_MAX_PAGES, max_chars: int = RESUME_MAX_CHARS) -> str:
+    """Cleaned text of a PDF, reading pages only until max_pages or max_chars is reached."""
+    parts, size = [], 0
+    for text in iter_page_texts(data, max_pages):
+        parts.append(text)
+        size += len(text) + 1
+        if size >= max_chars:
+            break
+    return clean_text(" ".join(parts)[:max_chars])
+
+def resume_result(text: str, skills: list) -> dict:
+    """parse_resume output for already-extracted text and skills."""
+    contact = extract_contact_info(text)
     return {
         "text": text,
         "skills": skills,
@@ -91,6 +261,33 @@ def parse_resume(file_path: str) -> dict:
         "phone": contact["phone"]
     }
 
+def parse_resume(source, use_cache: bool = True, max_pages: int = None, max_chars: int = None) -> dict:
+    """
+    Parse a PDF resume given as bytes / memoryview (e.g. an upload's
+    getbuffer(), parsed in memory without a copy) or as a file path.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        data = source
+    else:
+        with open(source, "rb") as fh:
+            data = fh.read()
+
+    max_pages = max_pages or RESUME_MAX_PAGES
+    max_chars = max_chars or RESUME_MAX_CHARS
+    key = content_hash(data)
+    if (max_pages, max_chars) != (RESUME_MAX_PAGES, RESUME_MAX_CHARS):
+        key += f":{max_pages}:{max_chars}"  # non-default budgets give a different text
+    if use_cache:
+        cached = models.get("resume_cache").get(key)
+        if cached is not None:
+            return cached
+
+    text = pdf_text(data, max_pages, max_chars)
+    result = resume_result(text, extract_skills(text))
+    if use_cache:
+        models.get("resume_cache").put(key, result)
+    return result
+
 # ================================
 # Parse job posting text or from URL
 # ================================
@@ -110,7 +307,21 @@ def parse_job_posting_from_url(url: str) -> dict:
 # ================================
 # Match resume to job based on extracted skills
 # ================================
-def match_resume_to_job(resume_data: dict, job_data: dict) -> dict:
+def match_resume_to_job(resume_data: dict, job_data: dict, semantic: bool = False, threshold: float = None) -> dict:
+    """
+    Exact (case-insensitive) skill overlap by default. With semantic=True,
+    near-synonyms such as "PyTorch"/"Torch" also match; the result then
+    includes a 'similarities' map of job skill -> (resume skill, cosine).
+    """
+    if semantic:
+        from backend.semantic import semantic_match, SEMANTIC_THRESHOLD
+
+        match = semantic_match(resume_data.get("skills", []), job_data.get("skills", []),
+                               threshold=SEMANTIC_THRESHOLD if threshold is None else threshold)
+        match["matched_skills"] = [s.title() for s in match["matched_skills"]]
+        match["missing_skills"] = [s.title() for s in match["missing_skills"]]
+        return match
+
     resume_skills = set([s.lower() for s in resume_data.get("skills", [])])
     job_skills = set([s.lower() for s in job_data.get("skills", [])])
 
@@ -128,9 +339,138 @@ def match_resume_to_job(resume_data: dict, job_data: dict) -> dict:
 # ================================
 # Convert Apify job object to comparable dict
 # ================================
-def apify_job_to_skill_dict(job: dict) -> dict:
+def _job_text(job: dict) -> tuple:
     title = job.get("Job Title", "No title provided")
     description = job.get("Description", "")
     skills_tags = job.get("Skills/Tags", "")
-    text = clean_text(f"{title} {description} {skills_tags}")
-    return {"title": title, "text": text, "skills": extract_skills(text)}
+    return title, clean_text(f"{title} {description} {skills_tags}")
+
+def job_url(job: dict) -> str:
+    return job.get("Job URL") or job.get("Link") or ""
+
+def job_content_hash(job: dict, version: str = None) -> str:
+    """
+    posting_hash (which covers the text skills are extracted from), versioned
+    by the extractor. Batch callers pass extractor_version() in once.
+    """
+    version = version or extractor_version()
+    return content_hash(f"{version}\n{posting_hash(job)}".encode("utf-8"))
+
+def apify_job_to_skill_dict(job: dict) -> dict:
+    return apify_jobs_to_skill_dicts([job])[0]
+
+models.register("job_skill_store", JobSkillStore)
+
+def apify_jobs_to_skill_dicts(jobs: list, batch_size: int = NER_BATCH_SIZE) -> list:
+    """
+    Batched apify_job_to_skill_dict, results in order.
+    Skills extracted at ingestion (see ingest_jobs) are reused; only postings
+    never seen before go through one batched NER pass.
+    """
+    dicts = []
+    keys = []
+    version = extractor_version()
+    for job in jobs:
+        title, text = _job_text(job)
+        dicts.append({"title": title, "text": text})
+        keys.append((job_url(job), job_content_hash(job, version)))
+
+    # 1. skills carried on the posting itself, 2. skills in the job_skills table
+    carried = [job.get("Content Hash") == key[1] and "Extracted Skills" in job for job, key in zip(jobs, keys)]
+    store = models.get("job_skill_store")
+    stored = store.get_many([key for key, c in zip(keys, carried) if not c])
+
+    todo = []
+    for i, job in enumerate(jobs):
+        if carried[i]:
+            dicts[i]["skills"] = list(job["Extracted Skills"])
+        elif keys[i] in stored:
+            dicts[i]["skills"] = list(stored[keys[i]])
+        else:
+            todo.append(i)
+
+    if todo:
+        skills = extract_skills_batch([dicts[i]["text"] for i in todo], batch_size=batch_size)
+        # Extraction may have settled on another NER model than the lookup assumed
+        version = extractor_version()
+        rows = []
+        for i, s in zip(todo, skills):
+            dicts[i]["skills"] = s
+            rows.append((keys[i][0], job_content_hash(jobs[i], version), dicts[i]["title"], s))
+        store.put_many(rows)
+    return dicts
+
+models.register("skill_index", SkillIndex)
+
+# Embed job skills at ingestion so semantic matching never runs the embedder mid-request
+SEMANTIC_PRECOMPUTE = os.getenv("SEMANTIC_PRECOMPUTE") == "1"
+
+def ingest_jobs(jobs: list) -> list:
+    """
+    Extract skills for freshly fetched postings once and store them with the
+    posting ("Extracted Skills" / "Content Hash") and in the job_skills table,
+    then add them to the inverted skill index (and, with SEMANTIC_PRECOMPUTE,
+    to the skill embedding table).
+    Returns the same job dicts, annotated in place.
+    """
+    dicts = apify_jobs_to_skill_dicts(jobs)
+    version = extractor_version()
+    for job, d in zip(jobs, dicts):
+        job["Extracted Skills"] = d["skills"]
+        job["Content Hash"] = job_content_hash(job, version)
+
+    models.get("skill_index").add([
+        {
+            "url": job_url(job),
+            "content_hash": job["Content Hash"],
+            "title": job.get("Job Title"),
+            "company": job.get("Company") or job.get("Company Name"),
+            "location": job.get("Location"),
+            "skills": job["Extracted Skills"],
+        }
+        for job in jobs
+    ])
+    if SEMANTIC_PRECOMPUTE:
+        from backend.semantic import precompute_embeddings
+
+        precompute_embeddings([s for job in jobs for s in job["Extracted Skills"]])
+    return jobs
+
+def ingest_job_stream(items) -> list:
+    """
+    ingest_jobs for an iterable of postings (e.g. iter_dataset_items): later
+    dataset pages download on a background thread while earlier batches go
+    through skill extraction. Returns the annotated postings in order.
+    """
+    jobs = []
+    for _, ingested in pipeline_batches(items, ingest_jobs):
+        jobs.extend(ingested)
+    return jobs
+
+def search_skill_index(resume_data: dict, k: int = 10) -> list:
+    """
+    Top-k indexed postings for a parsed resume, without fetching anything.
+    Returns [{'title', 'company', 'location', 'link', 'skills', 'score',
+    'matched', 'missing'}], best first.
+    """
+    index = models.get("skill_index")
+    hits = index.top_k(resume_data.get("skills", []), k)
+    jobs = index.get_jobs([job_id for _, job_id in hits])
+
+    results = []
+    for _, job_id in hits:
+        job = jobs.get(job_id)
+        if job is None:  # replaced by newer content since the index was read
+            continue
+        match = match_resume_to_job(resume_data, job)
+        results.append({
+            "title": job["title"] or "Unknown Role",
+            "company": job["company"] or "Unknown Company",
+            "location": job["location"] or "Unknown Location",
+            "link": job["url"] or "No link available",
+            "skills": [s.title() for s in job["skills"]],
+            "score": match["score"],
+            "matched": match["matched_skills"],
+            "missing": match["missing_skills"],
+        })
+    return results
@@ -0,0 +1,106 @@
+import os
+import re
+import json
+import time
+import threading
+from backend.database import get_db
+
+# ================================
+# Job-search result cache (TTL + stale-while-revalidate)
+# ================================
+# Keyed by normalized (keywords, location, max_items) and stored in SQLite,
+# so every user and every Streamlit process shares it.
+#   age < fresh_for            -> served from cache
+#   fresh_for <= age < max_age -> served from cache, refreshed in the background
+#   otherwise                  -> fetched synchronously
+JOB_CACHE_FRESH_FOR = float(os.getenv("JOB_CACHE_FRESH_FOR", "900"))   # 15 minutes
+JOB_CACHE_MAX_AGE = float(os.getenv("JOB_CACHE_MAX_AGE", "86400"))     # 1 day
+REFRESH_LEASE = 300  # seconds one process may spend refreshing a key before another may try
+
+
+def normalize_query(keywords: str, location: str, max_items: int, source: str = "") -> str:
+    kws = sorted({re.sub(r"\s+", " ", k).strip().lower() for k in (keywords or "").split(",") if k.strip()})
+    loc = re.sub(r"\s+", " ", location or "").strip().lower()
+    return json.dumps([source, kws, loc, int(max_items)])
+
+
+class SearchCache:
+    def __init__(self, fresh_for: float = JOB_CACHE_FRESH_FOR, max_age: float = JOB_CACHE_MAX_AGE):
+        self.fresh_for = fresh_for
+        self.max_age = max_age
+        db = get_db()
+        try:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    refreshing_until REAL NOT NULL DEFAULT 0
+                )
+            """)
+            db.commit()
+        finally:
+            db.close()
+
+    def _read(self, key: str):
+        db = get_db()
+        try:
+            return db.execute("SELECT payload, fetched_at FROM search_cache WHERE key = ?", (key,)).fetchone()
+        finally:
+            db.close()
+
+    def _write(self, key: str, items: list):
+        db = get_db()
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO search_cache (key, payload, fetched_at, refreshing_until) VALUES (?, ?, ?, 0)",
+                (key, json.dumps(items, ensure_ascii=False), time.time()),
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _acquire_refresh(self, key: str) -> bool:
+        """Cross-process lease so only one process refreshes a stale key at a time."""
+        now = time.time()
+        db = get_db()
+        try:
+            cur = db.execute(
+                "UPDATE search_cache SET refreshing_until = ? WHERE key = ? AND refreshing_until < ?",
+                (now + REFRESH_LEASE, key, now),
+            )
+            db.commit()
+            return cur.rowcount == 1
+        finally:
+            db.close()
+
+    def _refresh(self, key: str, fetch):
+        try:
+            items = fetch()
+            if items:
+                self._write(key, items)
+        except Exception as e:
+            print(f"⚠️ Background refresh failed for {key}: {e}")
+
+    def get_or_fetch(self, keywords: str, location: str, max_items: int, fetch, source: str = "") -> list:
+        """
+        Return cached results for the query, calling fetch() (which must
+        return a list of postings, or raise) only when needed. Empty results
+        are not cached. `source` (e.g. the actor id) keeps different scrapers apart.
+        """
+        key = normalize_query(keywords, location, max_items, source)
+        row = self._read(key)
+        if row:
+            payload, fetched_at = row
+            age = time.time() - fetched_at
+            if age < self.fresh_for:
+                return json.loads(payload)
+            if age < self.max_age:
+                if self._acquire_refresh(key):
+                    threading.Thread(target=self._refresh, args=(key, fetch), daemon=True).start()
+                return json.loads(payload)
+
+        items = fetch()
+        if items:
+            self._write(key, items)
+        return items
@@ -0,0 +1,181 @@
+import os
+import sys
+import tempfile
+import threading
+import numpy as np
+from backend import models
+
+# ================================
+# Skill embeddings (loaded on first use)
+# ================================
+EMBEDDING_MODEL_NAME = os.getenv("SKILL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDINGS_PATH = os.getenv("SKILL_EMBEDDINGS_PATH", "data/skill_embeddings.npz")
+SEMANTIC_THRESHOLD = float(os.getenv("SEMANTIC_THRESHOLD", "0.75"))
+
+
+def _load_embedder():
+    import torch
+    from transformers import AutoTokenizer, AutoModel
+
+    tokenizer = AutoTokenizer.from_pretrained(EMBEDDING_MODEL_NAME)
+    model = AutoModel.from_pretrained(EMBEDDING_MODEL_NAME)
+    model.eval()
+
+    def embed(texts: list) -> np.ndarray:
+        with torch.no_grad():
+            batch = tokenizer(texts, padding=True, truncation=True, max_length=32, return_tensors="pt")
+            hidden = model(**batch).last_hidden_state
+            mask = batch["attention_mask"].unsqueeze(-1).float()
+            pooled = (hidden * mask).sum(1) / mask.sum(1).clamp(min=1e-9)  # mean pooling
+        return pooled.numpy().astype(np.float32)
+
+    return embed
+
+models.register("skill_embedder", _load_embedder)
+
+
+class SkillEmbeddingCache:
+    """
+    Memoized, L2-normalized skill embeddings stored as rows of one matrix.
+    Each distinct (lowercased) skill is embedded once per process; the model
+    runs outside the lock, so concurrent lookups of known skills never wait
+    for it. save() persists the table to EMBEDDINGS_PATH (precompute_embeddings
+    calls it), so later processes skip the model; lookups never write to disk.
+    """
+
+    def __init__(self, path: str = EMBEDDINGS_PATH):
+        self.path = path
+        self._index = {}
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            data = np.load(self.path, allow_pickle=False)
+            if str(data["model"]) != EMBEDDING_MODEL_NAME:
+                return
+            self._matrix = data["vectors"]
+            self._index = {s: i for i, s in enumerate(data["skills"].tolist())}
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable skill embedding cache {self.path}: {e}")
+
+    def save(self):
+        """Write the table atomically (temp file + rename), so readers never see a partial file."""
+        if not self.path:
+            return
+        with self._lock:
+            skills = sorted(self._index, key=self._index.get)
+            matrix = self._matrix
+        tmp = None
+        try:
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=directory, suffix=".npz.tmp", delete=False) as fh:
+                tmp = fh.name
+                np.savez(fh, model=EMBEDDING_MODEL_NAME, skills=np.array(skills), vectors=matrix)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"⚠️ Could not persist skill embeddings: {e}")
+            if tmp and os.path.exists(tmp):
+                os.remove(tmp)
+
+    def __len__(self):
+        return len(self._index)
+
+    def vectors(self, skills: list) -> np.ndarray:
+        """Return a (len(skills), dim) matrix of unit vectors, embedding only unseen skills."""
+        keys = [s.lower().strip() for s in skills]
+        with self._lock:
+            new = sorted({k for k in keys if k not in self._index})
+        if new:
+            vecs = models.get("skill_embedder")(new)
+            vecs /= np.linalg.norm(vecs, axis=1, keepdims=True).clip(min=1e-12)
+            with self._lock:
+                # Another thread may have embedded some of these meanwhile
+                fresh = [i for i, k in enumerate(new) if k not in self._index]
+                if fresh:
+                    base = len(self._index)
+                    vecs = vecs[fresh]
+                    self._matrix = vecs if self._matrix.size == 0 else np.vstack([self._matrix, vecs])
+                    self._index.update({new[i]: base + n for n, i in enumerate(fresh)})
+        with self._lock:
+            return self._matrix[[self._index[k] for k in keys]]
+
+models.register("skill_embeddings", SkillEmbeddingCache)
+
+
+def precompute_embeddings(skills: list):
+    """Embed a skill vocabulary ahead of time (e.g. SKILLS_DICT or a job corpus) and persist the table."""
+    if skills:
+        cache = models.get("skill_embeddings")
+        known = len(cache)
+        cache.vectors(skills)
+        if len(cache) > known:
+            cache.save()
+
+
+# ================================
+# Semantic skill matching
+# ================================
+def semantic_match(resume_skills: list, job_skills: list, threshold: float = SEMANTIC_THRESHOLD) -> dict:
+    """
+    Match every job skill to its most similar resume skill with one matrix
+    multiply. A job skill counts as matched when the cosine similarity is at
+    least `threshold` (exact matches always count, with similarity 1.0).
+
+    Returns {'score', 'matched_skills', 'missing_skills', 'similarities'},
+    where similarities maps each job skill to (closest resume skill, similarity).
+    """
+    resume = list(dict.fromkeys(s.lower().strip() for s in resume_skills if s.strip()))
+    job = list(dict.fromkeys(s.lower().strip() for s in job_skills if s.strip()))
+    if not job:
+        return {"score": 0, "matched_skills": [], "missing_skills": [], "similarities": {}}
+    if not resume:
+        return {"score": 0.0, "matched_skills": [], "missing_skills": job, "similarities": {}}
+
+    cache = models.get("skill_embeddings")
+    sims = cache.vectors(job) @ cache.vectors(resume).T   # (n_job, n_resume) cosine similarities
+    resume_set = set(resume)
+    best = sims.argmax(axis=1)
+
+    matched, missing, similarities = [], [], {}
+    for i, skill in enumerate(job):
+        if skill in resume_set:
+            closest, sim = skill, 1.0
+        else:
+            closest, sim = resume[best[i]], float(sims[i, best[i]])
+        similarities[skill] = (closest, round(sim, 4))
+        (matched if sim >= threshold else missing).append(skill)
+
+    return {
+        "score": round(len(matched) / len(job) * 100, 2),
+        "matched_skills": matched,
+        "missing_skills": missing,
+        "similarities": similarities,
+    }
+
+
+# ================================
+# CLI: precompute the whole vocabulary
+# ================================
+#   python -m backend.semantic [skills.txt ...]
+# Embeds the skill taxonomy (SKILLS_DICT + SKILLS_FILE), every skill in the
+# job skill index and any extra files given, then writes EMBEDDINGS_PATH.
+def main(argv=None):
+    from backend.skill_matcher import load_taxonomy
+    from backend.resume_job_parser import get_skill_matcher
+
+    skills = list(get_skill_matcher().skills)
+    skills += models.get("skill_index").skills()
+    for path in argv if argv is not None else sys.argv[1:]:
+        skills += load_taxonomy(path)
+    precompute_embeddings(skills)
+    print(f"✅ {len(models.get('skill_embeddings'))} skill embeddings in {EMBEDDINGS_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+from collections import Counter
+
+# ================================
+# Skill-gap analytics over match history (MySQL, see ob.py)
+# ================================
+# job_matches keeps matched/missing skills as comma-joined text, so "most
+# common missing skills" would mean scanning and splitting every row.
+# These aggregate tables are maintained incrementally instead: each batch
+# of matches adds its counts with INSERT ... ON DUPLICATE KEY UPDATE in the
+# same transaction as the job_matches rows (see analytics_statements), and
+# dashboards read a handful of pre-aggregated rows.
+ANALYTICS_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS skill_gap_user (
+        user_id INT NOT NULL,
+        period CHAR(7) NOT NULL,
+        skill VARCHAR(255) NOT NULL,
+        missing_count INT NOT NULL DEFAULT 0,
+        matched_count INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, period, skill)
+    );""",
+    """
+    CREATE TABLE IF NOT EXISTS skill_gap_keyword (
+        keyword VARCHAR(255) NOT NULL,
+        period CHAR(7) NOT NULL,
+        skill VARCHAR(255) NOT NULL,
+        missing_count INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (keyword, period, skill)
+    );""",
+    """
+    CREATE TABLE IF NOT EXISTS keyword_scores (
+        keyword VARCHAR(255) NOT NULL,
+        period CHAR(7) NOT NULL,
+        match_count INT NOT NULL DEFAULT 0,
+        score_sum DOUBLE NOT NULL DEFAULT 0,
+        PRIMARY KEY (keyword, period)
+    );""",
+]
+
+_UPSERT_USER_SQL = """
+    INSERT INTO skill_gap_user (user_id, period, skill, missing_count, matched_count)
+    VALUES (%s,%s,%s,%s,%s)
+    ON DUPLICATE KEY UPDATE missing_count = missing_count + VALUES(missing_count),
+                            matched_count = matched_count + VALUES(matched_count)
+"""
+_UPSERT_KEYWORD_SQL = """
+    INSERT INTO skill_gap_keyword (keyword, period, skill, missing_count)
+    VALUES (%s,%s,%s,%s)
+    ON DUPLICATE KEY UPDATE missing_count = missing_count + VALUES(missing_count)
+"""
+_UPSERT_SCORE_SQL = """
+    INSERT INTO keyword_scores (keyword, period, match_count, score_sum)
+    VALUES (%s,%s,%s,%s)
+    ON DUPLICATE KEY UPDATE match_count = match_count + VALUES(match_count),
+                            score_sum = score_sum + VALUES(score_sum)
+"""
+
+
+def period_of(timestamp: str) -> str:
+    """'2025-03-14 09:30:00' -> '2025-03' (aggregates are monthly)."""
+    return str(timestamp)[:7]
+
+
+def analytics_statements(user_id, matched_at: str, matches) -> list:
+    """
+    [(sql, rows)] that add a batch of matches to the aggregates; append them
+    to the statements of the job_matches insert so both commit together.
+    matches: iterable of (keywords, matched_skills, missing_skills, score).
+    Counts are summed per key here, so each aggregate row is touched once
+    per batch.
+    """
+    period = period_of(matched_at)
+    missing_by_user, matched_by_user = Counter(), Counter()
+    missing_by_keyword = Counter()
+    scores = {}
+    for keywords, matched, missing, score in matches:
+        missing_by_user.update(missing)
+        matched_by_user.update(matched)
+        for kw in keywords:
+            missing_by_keyword.update((kw, s) for s in missing)
+            count, total = scores.get(kw, (0, 0.0))
+            scores[kw] = (count + 1, total + float(score))
+
+    statements = []
+    if user_id is not None:
+        skills = sorted(set(missing_by_user) | set(matched_by_user))
+        statements.append((_UPSERT_USER_SQL, [
+            (user_id, period, s, missing_by_user[s], matched_by_user[s]) for s in skills
+        ]))
+    statements.append((_UPSERT_KEYWORD_SQL, [
+        (kw, period, s, n) for (kw, s), n in sorted(missing_by_keyword.items())
+    ]))
+    statements.append((_UPSERT_SCORE_SQL, [
+        (kw, period, count, total) for kw, (count, total) in sorted(scores.items())
+    ]))
+    return statements
+
+
+# -------------------------
+# Queries (rows come back as dicts with ob.py's DictCursor)
+# -------------------------
+def _fetch(get_conn, sql, params):
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            return cur.fetchall()
+    finally:
+        conn.close()
+
+
+def top_missing_skills(get_conn, user_id=None, keyword=None, period=None, limit=10):
+    """Most frequently missing skills for a user or a search keyword, optionally for one 'YYYY-MM' period."""
+    if user_id is not None:
+        sql = "SELECT skill, SUM(missing_count) AS missing FROM skill_gap_user WHERE user_id = %s"
+        params = [user_id]
+    elif keyword:
+        sql = "SELECT skill, SUM(missing_count) AS missing FROM skill_gap_keyword WHERE keyword = %s"
+        params = [keyword.strip().lower()]
+    else:
+        raise ValueError("top_missing_skills needs a user_id or a keyword")
+    if period:
+        sql += " AND period = %s"
+        params.append(period)
+    sql += " GROUP BY skill HAVING missing > 0 ORDER BY missing DESC, skill LIMIT %s"
+    return _fetch(get_conn, sql, params + [limit])
+
+
+def keyword_average_scores(get_conn, period=None, limit=20):
+    """Average match score and number of matches per search keyword, busiest keywords first."""
+    sql = """
+        SELECT keyword, SUM(match_count) AS matches, SUM(score_sum) / SUM(match_count) AS avg_score
+        FROM keyword_scores
+    """
+    params = []
+    if period:
+        sql += " WHERE period = %s"
+        params.append(period)
+    sql += " GROUP BY keyword ORDER BY matches DESC, keyword LIMIT %s"
+    return _fetch(get_conn, sql, params + [limit])
+
+
+def rebuild_user_gaps(get_conn, page_size: int = 5000):
+    """
+    Recompute skill_gap_user from job_matches, e.g. for history recorded
+    before the aggregates existed. job_matches does not keep the search
+    keywords, so the keyword tables only cover matches stored since then.
+    Run it while no matches are being written.
+    """
+    conn = get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM skill_gap_user")
+        conn.commit()
+    finally:
+        conn.close()
+
+    last_id, total = 0, 0
+    while True:
+        rows = _fetch(get_conn, """
+            SELECT id, user_id, matched_skills, missing_skills, matched_at
+            FROM job_matches WHERE id > %s AND user_id IS NOT NULL
+            ORDER BY id LIMIT %s
+        """, (last_id, page_size))
+        if not rows:
+            return total
+        missing, matched = Counter(), Counter()
+        for r in rows:
+            key = (r["user_id"], period_of(r["matched_at"]))
+            missing.update((key, s) for s in (r["missing_skills"] or "").split(",") if s)
+            matched.update((key, s) for s in (r["matched_skills"] or "").split(",") if s)
+        conn = get_conn()
+        try:
+            with conn.cursor() as cur:
+                cur.executemany(_UPSERT_USER_SQL, [
+                    (user_id, period, s, missing[((user_id, period), s)], matched[((user_id, period), s)])
+                    for (user_id, period), s in sorted(set(missing) | set(matched))
+                ])
+            conn.commit()
+        finally:
+            conn.close()
+        last_id = rows[-1]["id"]
+        total += len(rows)
@@ -0,0 +1,203 @@
+import json
+import heapq
+import threading
+from datetime import datetime
+from backend.database import get_db
+
+# ================================
+# Inverted skill index over the job corpus
+# ================================
+# skill -> posting ids, persisted in SQLite and mirrored in memory.
+# top_k() only touches postings that share a skill with the resume and
+# skips candidates that cannot beat the current k-th score. Scores use the
+# same semantics as match_resume_to_job (percent of job skills covered).
+
+
+class SkillIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}   # skill -> set(job_id)
+        self._skills = {}     # job_id -> frozenset(skills)
+        self._last_id = 0
+        db = get_db()
+        try:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS indexed_jobs (
+                    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT UNIQUE,
+                    content_hash TEXT,
+                    title TEXT,
+                    company TEXT,
+                    location TEXT,
+                    skills TEXT NOT NULL,
+                    added_at TEXT
+                )
+            """)
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS skill_postings (
+                    skill TEXT NOT NULL,
+                    job_id INTEGER NOT NULL,
+                    PRIMARY KEY (skill, job_id)
+                ) WITHOUT ROWID
+            """)
+            if not db.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_indexed_jobs_hash'").fetchone():
+                # Postings without a URL are identified by content hash; drop
+                # copies indexed before that was enforced, then keep it unique.
+                duplicates = """
+                    SELECT job_id FROM indexed_jobs j WHERE url IS NULL AND content_hash IS NOT NULL
+                    AND job_id > (SELECT MIN(job_id) FROM indexed_jobs k
+                                  WHERE k.url IS NULL AND k.content_hash = j.content_hash)
+                """
+                db.execute(f"DELETE FROM skill_postings WHERE job_id IN ({duplicates})")
+                db.execute(f"DELETE FROM indexed_jobs WHERE job_id IN ({duplicates})")
+                db.execute(
+                    "CREATE UNIQUE INDEX idx_indexed_jobs_hash ON indexed_jobs (content_hash) WHERE url IS NULL"
+                )
+            db.commit()
+        finally:
+            db.close()
+        self.refresh()
+
+    # ---------- maintenance ----------
+    def refresh(self):
+        """Pull postings added by other processes since the last refresh."""
+        with self._lock:
+            db = get_db()
+            try:
+                rows = db.execute(
+                    "SELECT job_id, skills FROM indexed_jobs WHERE job_id > ? ORDER BY job_id", (self._last_id,)
+                ).fetchall()
+            finally:
+                db.close()
+            for job_id, skills in rows:
+                self._add_to_memory(job_id, json.loads(skills))
+
+    def _add_to_memory(self, job_id: int, skills: list):
+        skills = frozenset(s.lower() for s in skills if s)
+        self._skills[job_id] = skills
+        for s in skills:
+            self._postings.setdefault(s, set()).add(job_id)
+        self._last_id = max(self._last_id, job_id)
+
+    def _remove_from_memory(self, job_id: int):
+        for s in self._skills.pop(job_id, ()):
+            ids = self._postings.get(s)
+            if ids:
+                ids.discard(job_id)
+                if not ids:
+                    del self._postings[s]
+
+    def add(self, postings: list):
+        """
+        Index postings incrementally. postings: [{'url', 'content_hash',
+        'title', 'company', 'location', 'skills'}]. Postings are identified
+        by URL, or by content hash when they have none. One already indexed
+        with the same content hash is skipped; changed content replaces it.
+        A posting without a content hash (e.g. a backfill) never replaces an
+        indexed one.
+        """
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            db = get_db()
+            try:
+                for p in postings:
+                    url = p.get("url") or None
+                    key = p.get("content_hash")
+                    if url:
+                        row = db.execute(
+                            "SELECT job_id, content_hash FROM indexed_jobs WHERE url = ?", (url,)
+                        ).fetchone()
+                    elif key:
+                        row = db.execute(
+                            "SELECT job_id, content_hash FROM indexed_jobs WHERE url IS NULL AND content_hash = ?",
+                            (key,),
+                        ).fetchone()
+                    else:
+                        row = None
+                    if row and (key is None or row[1] == key):
+                        continue
+                    if row:
+                        db.execute("DELETE FROM skill_postings WHERE job_id = ?", (row[0],))
+                        db.execute("DELETE FROM indexed_jobs WHERE job_id = ?", (row[0],))
+                        self._remove_from_memory(row[0])
+
+                    skills = sorted({s.lower() for s in p.get("skills", []) if s})
+                    cur = db.execute(
+                        "INSERT INTO indexed_jobs (url, content_hash, title, company, location, skills, added_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (url, p.get("content_hash"), p.get("title"), p.get("company"), p.get("location"),
+                         json.dumps(skills), now),
+                    )
+                    job_id = cur.lastrowid
+                    db.executemany(
+                        "INSERT OR IGNORE INTO skill_postings (skill, job_id) VALUES (?, ?)",
+                        [(s, job_id) for s in skills],
+                    )
+                    self._add_to_memory(job_id, skills)
+                db.commit()
+            finally:
+                db.close()
+
+    # ---------- retrieval ----------
+    def top_k(self, resume_skills: list, k: int = 10) -> list:
+        """
+        Best k postings for a resume: [(score, job_id)], best first.
+        Posting lists are processed rarest skill first. A posting first seen
+        while only `remaining` lists are left can match at most `remaining`
+        of its skills; it is skipped if that bound is below the k-th best
+        score already guaranteed.
+        """
+        if k <= 0:
+            return []
+        self.refresh()
+        resume = {s.lower() for s in resume_skills if s}
+        with self._lock:
+            lists = sorted((self._postings[s] for s in resume if s in self._postings), key=len)
+            sizes = {}
+            counts = {}
+            threshold = 0.0
+            for n, ids in enumerate(lists):
+                remaining = len(lists) - n
+                for job_id in ids:
+                    if job_id in counts:
+                        counts[job_id] += 1
+                        continue
+                    size = sizes[job_id] = len(self._skills[job_id])
+                    if len(counts) >= k and min(remaining, size) / size * 100 < threshold:
+                        continue
+                    counts[job_id] = 1
+                if len(counts) >= k:
+                    # Scores only grow from here, so the current k-th is a safe lower bound
+                    threshold = heapq.nlargest(k, (c / sizes[j] * 100 for j, c in counts.items()))[-1]
+
+            scored = ((round(c / sizes[j] * 100, 2), j) for j, c in counts.items())
+            return heapq.nlargest(k, scored, key=lambda x: (x[0], -x[1]))
+
+    def get_jobs(self, job_ids: list) -> dict:
+        """Stored metadata for the given ids: {job_id: {...}}."""
+        if not job_ids:
+            return {}
+        db = get_db()
+        try:
+            rows = db.execute(
+                f"SELECT job_id, url, title, company, location, skills FROM indexed_jobs "
+                f"WHERE job_id IN ({','.join('?' * len(job_ids))})",
+                list(job_ids),
+            ).fetchall()
+        finally:
+            db.close()
+        return {
+            r[0]: {"job_id": r[0], "url": r[1], "title": r[2], "company": r[3], "location": r[4],
+                   "skills": json.loads(r[5])}
+            for r in rows
+        }
+
+    def skills(self) -> list:
+        """Every skill that occurs in at least one indexed posting."""
+        self.refresh()
+        with self._lock:
+            return list(self._postings)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"jobs": len(self._skills), "skills": len(self._postings)}
@@ -0,0 +1,99 @@
+import hashlib
+from collections import deque
+
+# ================================
+# Aho-Corasick multi-pattern skill matcher
+# ================================
+# Characters that continue a skill token. "+" and "#" are included so that
+# "C" does not match inside "C++" or "C#", and "Java" does not match inside
+# "JavaScript".
+_WORD_EXTRA = set("+#_")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch in _WORD_EXTRA
+
+
+class SkillMatcher:
+    """
+    Precompiled automaton over a skill taxonomy.
+    find() scans a text once, case-insensitively, and only reports skills
+    that start and end on word boundaries.
+    """
+
+    def __init__(self, skills):
+        self._goto = [{}]      # state -> {char: next state}
+        self._fail = [0]       # state -> failure link
+        self._out = [[]]       # state -> [(pattern length, canonical skill)]
+        self.size = 0
+        self.skills = []       # canonical skills, in the order they were added
+
+        seen = set()
+        for skill in skills:
+            skill = skill.strip()
+            key = skill.lower()
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            self.skills.append(skill)
+            self._add(key, skill)
+        self._build()
+        # Identifies the taxonomy contents, e.g. for versioning cached extractions
+        self.digest = hashlib.sha256("\n".join(self.skills).encode("utf-8")).hexdigest()[:12]
+
+    def _add(self, key: str, skill: str):
+        state = 0
+        for ch in key:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(key), skill))
+        self.size += 1
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                if state:
+                    fail = self._fail[state]
+                    while fail and ch not in self._goto[fail]:
+                        fail = self._fail[fail]
+                    self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> list:
+        """Return the canonical names of all skills found in text, in order of first occurrence."""
+        if not text:
+            return []
+        low = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        found = {}
+        state = 0
+        n = len(low)
+        for i, ch in enumerate(low):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, skill in out[state]:
+                if skill in found:
+                    continue
+                start = i - length + 1
+                if start > 0 and _is_word_char(low[start - 1]) and _is_word_char(low[start]):
+                    continue
+                if i + 1 < n and _is_word_char(low[i + 1]) and _is_word_char(ch):
+                    continue
+                found[skill] = None
+        return list(found)
+
+
+def load_taxonomy(path: str) -> list:
+    """Read one skill per line; blank lines and lines starting with '#' are ignored."""
+    with open(path, "r", encoding="utf-8") as fh:
+        return [line.strip() for line in fh if line.strip() and not line.lstrip().startswith("#")]
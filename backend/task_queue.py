@@ -0,0 +1,296 @@
+import os
+import json
+import time
+import uuid
+import threading
+from backend.database import get_db
+
+# ================================
+# Persistent background task queue
+# ================================
+# Tasks live in SQLite, so they survive restarts and any process can report
+# on them; a fixed pool of worker threads runs them. A running task holds a
+# lease that progress() renews; a task whose worker died (lease expired) is
+# picked up again. Failed tasks are retried with exponential backoff.
+#   queued -> running -> done | failed | cancelled
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "4"))               # tasks running at once per process
+TASK_MAX_PENDING = int(os.getenv("TASK_MAX_PENDING", "100"))     # queued + running before submit() refuses
+TASK_MAX_PER_OWNER = int(os.getenv("TASK_MAX_PER_OWNER", "2"))   # active tasks per user
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+TASK_RETRY_BACKOFF = float(os.getenv("TASK_RETRY_BACKOFF", "5"))  # seconds, doubled per attempt
+TASK_LEASE = float(os.getenv("TASK_LEASE", "600"))                # seconds without progress before a task is presumed lost
+TASK_POLL_INTERVAL = 1.0
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class QueueFull(RuntimeError):
+    """submit() was refused because too many tasks are already pending."""
+
+
+class TaskCancelled(Exception):
+    """Raised inside a handler (from progress()/check_cancelled()) once cancel() was requested."""
+
+
+class TaskContext:
+    """What a handler sees: the payload plus progress reporting and cancellation checks."""
+
+    def __init__(self, queue, task_id: int, token: str, payload):
+        self._queue = queue
+        self.id = task_id
+        self.token = token
+        self.payload = payload
+
+    def progress(self, fraction: float, message: str = ""):
+        """Record progress (0..1) and renew the lease; raises TaskCancelled if cancellation was requested."""
+        if self._queue._heartbeat(self.id, self.token, fraction, message):
+            raise TaskCancelled()
+
+    def check_cancelled(self):
+        if self._queue._heartbeat(self.id, self.token, None, None):
+            raise TaskCancelled()
+
+
+class TaskQueue:
+    def __init__(self, workers: int = TASK_WORKERS, max_pending: int = TASK_MAX_PENDING,
+                 max_per_owner: int = TASK_MAX_PER_OWNER, lease: float = TASK_LEASE):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_per_owner = max_per_owner
+        self.lease = lease
+        self._handlers = {}
+        self._threads = []
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        db = get_db()
+        try:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    owner TEXT,
+                    payload TEXT,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    progress REAL NOT NULL DEFAULT 0,
+                    message TEXT,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    token TEXT,
+                    lease_until REAL NOT NULL DEFAULT 0,
+                    available_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, available_at, id)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_tasks_owner ON tasks (owner, id)")
+            db.commit()
+        finally:
+            db.close()
+
+    # -------------------------
+    # Producer side
+    # -------------------------
+    def register(self, kind: str, handler):
+        """handler(task: TaskContext) -> JSON-serializable result."""
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, payload=None, owner=None, max_attempts: int = TASK_MAX_ATTEMPTS) -> int:
+        """Queue a task and return its id. Raises QueueFull when the queue (or this owner) is at its limit."""
+        now = time.time()
+        db = get_db()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            pending = db.execute(
+                "SELECT COUNT(*) FROM tasks WHERE status IN (?, ?)", ACTIVE_STATUSES
+            ).fetchone()[0]
+            if pending >= self.max_pending:
+                raise QueueFull(f"{pending} tasks are already pending; try again shortly")
+            if owner is not None:
+                mine = db.execute(
+                    "SELECT COUNT(*) FROM tasks WHERE owner = ? AND status IN (?, ?)", (owner, *ACTIVE_STATUSES)
+                ).fetchone()[0]
+                if mine >= self.max_per_owner:
+                    raise QueueFull(f"You already have {mine} tasks running; wait for them or cancel one")
+            cur = db.execute(
+                """INSERT INTO tasks (kind, owner, payload, max_attempts, available_at, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (kind, owner, json.dumps(payload, ensure_ascii=False), max_attempts, now, now, now),
+            )
+            db.commit()
+            task_id = cur.lastrowid
+        finally:
+            db.close()
+        self._wakeup.set()
+        return task_id
+
+    def get(self, task_id: int):
+        """Task state as a dict (payload and result decoded), or None."""
+        db = get_db()
+        try:
+            cur = db.execute("""
+                SELECT id, kind, owner, payload, status, progress, message, result, error,
+                       attempts, max_attempts, cancel_requested, created_at, updated_at
+                FROM tasks WHERE id = ?
+            """, (task_id,))
+            row = cur.fetchone()
+            if row is None:
+                return None
+            task = dict(zip([c[0] for c in cur.description], row))
+        finally:
+            db.close()
+        task["payload"] = json.loads(task["payload"]) if task["payload"] else None
+        task["result"] = json.loads(task["result"]) if task["result"] else None
+        return task
+
+    def cancel(self, task_id: int) -> bool:
+        """Cancel a queued task immediately, or ask a running one to stop at its next progress()."""
+        now = time.time()
+        db = get_db()
+        try:
+            cur = db.execute(
+                "UPDATE tasks SET status = 'cancelled', updated_at = ? WHERE id = ? AND status = 'queued'",
+                (now, task_id),
+            )
+            if cur.rowcount == 0:
+                cur = db.execute(
+                    "UPDATE tasks SET cancel_requested = 1, updated_at = ? WHERE id = ? AND status = 'running'",
+                    (now, task_id),
+                )
+            db.commit()
+            return cur.rowcount == 1
+        finally:
+            db.close()
+
+    def purge(self, older_than: float = 7 * 86400) -> int:
+        """Delete finished tasks not updated for older_than seconds."""
+        db = get_db()
+        try:
+            cur = db.execute(
+                "DELETE FROM tasks WHERE status NOT IN (?, ?) AND updated_at < ?",
+                (*ACTIVE_STATUSES, time.time() - older_than),
+            )
+            db.commit()
+            return cur.rowcount
+        finally:
+            db.close()
+
+    # -------------------------
+    # Worker side
+    # -------------------------
+    def start(self):
+        """Start the worker threads (idempotent)."""
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                t = threading.Thread(target=self._work, daemon=True)
+                t.start()
+                self._threads.append(t)
+        return self
+
+    def _claim(self):
+        """Atomically take the oldest runnable task (or one whose worker lost its lease)."""
+        now = time.time()
+        token = uuid.uuid4().hex
+        db = get_db()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute(
+                """UPDATE tasks SET status = 'failed', error = COALESCE(error, 'worker lost'), updated_at = ?
+                   WHERE status = 'running' AND lease_until < ? AND attempts >= max_attempts""",
+                (now, now),
+            )
+            row = db.execute(
+                """SELECT id, kind, payload FROM tasks
+                   WHERE (status = 'queued' AND available_at <= ?) OR (status = 'running' AND lease_until < ?)
+                   ORDER BY id LIMIT 1""",
+                (now, now),
+            ).fetchone()
+            if row:
+                db.execute(
+                    """UPDATE tasks SET status = 'running', token = ?, attempts = attempts + 1,
+                                        lease_until = ?, updated_at = ?
+                       WHERE id = ?""",
+                    (token, now + self.lease, now, row[0]),
+                )
+            db.commit()
+        finally:
+            db.close()
+        if row is None:
+            return None
+        task_id, kind, payload = row
+        return kind, TaskContext(self, task_id, token, json.loads(payload) if payload else None)
+
+    def _update(self, task_id: int, token: str, sql: str, params: tuple) -> int:
+        """Apply an update only if this worker still holds the task."""
+        db = get_db()
+        try:
+            cur = db.execute(f"UPDATE tasks SET {sql}, updated_at = ? WHERE id = ? AND token = ?",
+                             (*params, time.time(), task_id, token))
+            db.commit()
+            return cur.rowcount
+        finally:
+            db.close()
+
+    def _heartbeat(self, task_id, token, fraction, message) -> bool:
+        """Renew the lease (and progress); True if the task should stop."""
+        if fraction is None:
+            self._update(task_id, token, "lease_until = ?", (time.time() + self.lease,))
+        else:
+            self._update(task_id, token, "progress = ?, message = ?, lease_until = ?",
+                         (max(0.0, min(1.0, fraction)), message, time.time() + self.lease))
+        db = get_db()
+        try:
+            row = db.execute("SELECT cancel_requested, token FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        finally:
+            db.close()
+        # Stop as well if another worker has taken the task over
+        return row is None or bool(row[0]) or row[1] != token
+
+    def _work(self):
+        while True:
+            try:
+                claimed = self._claim()
+            except Exception as e:
+                print(f"⚠️ Task queue unavailable: {e}")
+                claimed = None
+            if claimed is None:
+                self._wakeup.wait(TASK_POLL_INTERVAL)
+                self._wakeup.clear()
+                continue
+            kind, task = claimed
+            self._run(kind, task)
+
+    def _run(self, kind: str, task: TaskContext):
+        handler = self._handlers.get(kind)
+        try:
+            if handler is None:
+                raise KeyError(f"No handler registered for task kind '{kind}'")
+            result = handler(task)
+        except TaskCancelled:
+            self._update(task.id, task.token, "status = 'cancelled', token = NULL", ())
+        except Exception as e:
+            print(f"⚠️ Task {task.id} ({kind}) failed: {e}")
+            db = get_db()
+            try:
+                attempts, max_attempts, cancel_requested = db.execute(
+                    "SELECT attempts, max_attempts, cancel_requested FROM tasks WHERE id = ?", (task.id,)
+                ).fetchone()
+            finally:
+                db.close()
+            if cancel_requested:
+                self._update(task.id, task.token, "status = 'cancelled', token = NULL, error = ?", (str(e),))
+            elif attempts < max_attempts and handler is not None:
+                delay = TASK_RETRY_BACKOFF * 2 ** (attempts - 1)
+                self._update(task.id, task.token,
+                             "status = 'queued', token = NULL, error = ?, available_at = ?",
+                             (str(e), time.time() + delay))
+            else:
+                self._update(task.id, task.token, "status = 'failed', token = NULL, error = ?", (str(e),))
+        else:
+            self._update(task.id, task.token,
+                         "status = 'done', token = NULL, error = NULL, progress = 1, result = ?",
+                         (json.dumps(result, ensure_ascii=False),))
@@ -1,11 +1,11 @@
+import os
 import streamlit as st
+from backend import models
 from main import match_resume_with_jobs
 from backend.gemini_helper import (
-    generate_interview_questions,
-    generate_answer,
-    generate_cold_email,
+    generate_answer_stream,
+    generate_cold_email_stream,
     suggest_skill_improvements,
-    summarize_skills
 )
 from backend.auth import signup_user, login_user
 from backend.database import init_db, get_db
@@ -19,6 +19,20 @@ st.title("🧠 Career Captain – AI Resume Job Matcher & Interview Coach")
 # Initialize DB
 init_db()
 
+# Optionally start loading the NER model in the background so the first search
+# does not pay for it. Off by default to keep cold start fast.
+@st.cache_resource
+def _warm_up_models():
+    return models.warm_up("ner", background=True)
+
+if os.getenv("WARM_UP_MODELS") == "1":
+    _warm_up_models()
+
+def question_list(text) -> list:
+    """Split the generated questions text into one entry per question."""
+    lines = [line.strip().lstrip("•-*#0123456789.) ").rstrip("*").strip() for line in str(text or "").splitlines()]
+    return [line for line in lines if line and not line.endswith(":")]
+
 # ================================
 # Initialize Session State Safely
 # ================================
@@ -76,12 +90,13 @@ if st.session_state["user"]:
 
         if st.button("🚀 Find Matching Jobs"):
             if uploaded_file:
-                resume_path = "data/temp_resume.pdf"
-                with open(resume_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
+                st.session_state["resume_name"] = uploaded_file.name
 
                 with st.spinner("⏳ Analyzing your resume and fetching job listings..."):
-                    results = match_resume_with_jobs(resume_path, keywords, location, max_items, st.session_state["user"])
+                    # Scored results come back immediately; Gemini fields are generated on demand
+                    results = match_resume_with_jobs(
+                        uploaded_file.getbuffer(), keywords, location, max_items, st.session_state["user"], lazy=True
+                    )
 
                 if results:
                     st.session_state["job_results"] = results
@@ -107,8 +122,8 @@ if st.session_state["user"]:
                     st.write(f"❌ **Missing Skills:** {', '.join(r['missing']) or 'None'}")
 
                     # ---- Skill Summary ----
-                    if st.button(f"🧾 Summarize Skills", key=f"sum_{idx}"):
-                        summary = summarize_skills(r["title"], r["matched"], r["missing"])
+                    if st.button(f"🧾 Summarize Skills", key=f"sum_{idx}") or r["summary"].resolved:
+                        summary = r["summary"].get()  # memoized after the first click
                         st.session_state["skill_summary"] = summary
                         st.info(summary)
 
@@ -122,23 +137,27 @@ if st.session_state["user"]:
 
                     # ---- Interview Questions ----
                     if st.button(f"🎯 Generate Interview Questions", key=f"gen_q_{idx}"):
-                        st.session_state["questions"][idx] = generate_interview_questions(r)
+                        questions = r["ai_questions"].get()  # memoized, like the summary
+                        st.session_state["questions"][idx] = question_list(questions)
                     if idx in st.session_state["questions"]:
                         for q_idx, q in enumerate(st.session_state["questions"][idx]):
                             with st.expander(f"💬 Q{q_idx + 1}: {q}"):
                                 if st.button(f"💡 Generate Answer", key=f"ans_{idx}_{q_idx}"):
-                                    st.session_state["answers"][(idx, q_idx)] = generate_answer(q)
-                                if (idx, q_idx) in st.session_state["answers"]:
+                                    # Render tokens as they arrive, keep the full text for reruns
+                                    st.markdown("**Answer:**")
+                                    st.session_state["answers"][(idx, q_idx)] = st.write_stream(generate_answer_stream(q))
+                                elif (idx, q_idx) in st.session_state["answers"]:
                                     st.markdown(f"**Answer:** {st.session_state['answers'][(idx, q_idx)]}")
 
                     st.markdown("---")
 
                     # ---- Cold Email ----
                     if st.button(f"📧 Generate Cold Email for {r['company']}", key=f"cold_{idx}"):
-                        st.session_state["emails"][idx] = generate_cold_email(
-                            "data/temp_resume.pdf", r["title"], r["company"], r["skills"]
-                        )
-                    if idx in st.session_state["emails"]:
+                        st.session_state["emails"][idx] = st.write_stream(generate_cold_email_stream(
+                            st.session_state.get("resume_name", "resume.pdf"), r["title"], r["company"], r["skills"]
+                        ))
+                        st.success("✅ Cold Email Generated")
+                    elif idx in st.session_state["emails"]:
                         st.success("✅ Cold Email Generated:")
                         st.markdown(st.session_state["emails"][idx])
 
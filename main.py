@@ -1,41 +1,44 @@
 
 import os
-import sqlite3
+import math
+import atexit
+import time
 import hashlib
 from datetime import datetime
-from apify_client import ApifyClient
-import google.generativeai as genai
-from backend.resume_job_parser import parse_resume, apify_job_to_skill_dict, match_resume_to_job
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from backend.gemini_helper import generate_text, generate_job_insights_batch
+from backend import models
+from backend.database import get_db, init_db as init_app_db
+from backend.match_writer import MatchWriter, write_batch
+from backend.lazy import LazyValue
+from backend.search_cache import SearchCache
+from backend.fanout import split_queries, fan_out, FANOUT_TIMEOUT
+from backend.job_stream import iter_dataset_items, pipeline_batches
+from backend.resume_job_parser import (
+    parse_resume, apify_jobs_to_skill_dicts, ingest_jobs, ingest_job_stream, match_resume_to_job, search_skill_index
+)
 
 # ================================
 # CONFIGURATION 
 # ================================
 APIFY_TOKEN = os.getenv("APIFY_TOKEN", "YOUR_APIFY_TOKEN_HERE")
 APIFY_ACTOR = "apify/linkedin-jobs-scraper"
+GEMINI_MODEL = "gemini-2.0-flash"
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))  # parallel Gemini calls per search
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))                # seconds per Gemini call
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "YOUR_GEMINI_API_KEY_HERE")
-genai.configure(api_key=GEMINI_API_KEY)
+ASYNC_SEARCH_WRITES = os.getenv("ASYNC_SEARCH_WRITES", "1") == "1"  # persist results off the request path
+
+models.register("search_cache", SearchCache)
+_search_writer = MatchWriter(get_db)
+atexit.register(_search_writer.flush)  # the writer thread is a daemon; don't lose queued searches on exit
 
 
 # ================================
 # DATABASE INITIALIZATION
 # ================================
 def init_db():
-    conn = sqlite3.connect("career_captain.db")
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS user_searches (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT,
-            keywords TEXT,
-            location TEXT,
-            timestamp TEXT,
-            top_job TEXT,
-            score INTEGER
-        )
-    """)
-    conn.commit()
-    conn.close()
+    init_app_db()  # users, searches and user_searches, via backend.database.MIGRATIONS
 
 
 # ================================
@@ -53,7 +56,7 @@ def verify_password(input_password: str, stored_hash: str) -> bool:
 # ================================
 # GEMINI SUMMARIZER
 # ================================
-def summarize_skills(job_title, matched_skills, missing_skills):
+def summarize_skills(job_title, matched_skills, missing_skills, timeout=LLM_TIMEOUT):
     """Summarize how well the candidate fits a given role."""
     prompt = f"""
     You are a career analyst. Evaluate the candidate's fit for the role '{job_title}'.
@@ -62,9 +65,7 @@ def summarize_skills(job_title, matched_skills, missing_skills):
     Write a short summary (3–5 lines) highlighting key strengths and skill improvement suggestions.
     """
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        response = model.generate_content(prompt)
-        return response.text.strip() if response and hasattr(response, "text") else "No summary available."
+        return generate_text(prompt, GEMINI_MODEL, request_options={"timeout": timeout}) or "No summary available."
     except Exception as e:
         return f"⚠️ Gemini Summary Error: {e}"
 
@@ -72,7 +73,7 @@ def summarize_skills(job_title, matched_skills, missing_skills):
 # ================================
 # INTERVIEW QUESTIONS GENERATOR
 # ================================
-def generate_questions(job_title, skills, matched, missing):
+def generate_questions(job_title, skills, matched, missing, timeout=LLM_TIMEOUT):
     prompt = f"""
     You are an interview coach. The candidate is applying for '{job_title}'.
     Job skills: {', '.join(skills)}.
@@ -84,118 +85,276 @@ def generate_questions(job_title, skills, matched, missing):
     • 5 technical practice questions for improvement.
     """
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        response = model.generate_content(prompt)
-        return response.text.strip() if response and hasattr(response, "text") else "⚠️ Could not generate questions."
+        return generate_text(prompt, GEMINI_MODEL, request_options={"timeout": timeout}) or "⚠️ Could not generate questions."
     except Exception as e:
         return f"⚠️ Gemini Error: {e}"
 
 
 # ================================
-# FETCH JOBS (LinkedIn Scraper)
+# CONCURRENT LLM CALLS
 # ================================
-def fetch_jobs(keywords, location, max_items=5):
-    """Fetch jobs dynamically from LinkedIn using Apify."""
-    client = ApifyClient(APIFY_TOKEN)
+def run_llm_calls(calls, max_workers=LLM_MAX_CONCURRENCY, timeout=LLM_TIMEOUT):
+    """
+    Run zero-argument callables on a bounded thread pool and return their
+    results in the original order. Each call is expected to enforce its own
+    timeout; as a safety net, calls still unfinished once every batch of
+    workers has had `timeout` seconds get an error string instead.
+    """
+    if not calls:
+        return []
+    workers = max(1, min(max_workers, len(calls)))
+    deadline = time.monotonic() + timeout * math.ceil(len(calls) / workers) + 1
+    pool = ThreadPoolExecutor(max_workers=workers)
+    futures = [pool.submit(call) for call in calls]
+    results = []
     try:
+        for future in futures:
+            try:
+                results.append(future.result(timeout=max(0, deadline - time.monotonic())))
+            except FutureTimeout:
+                results.append("⚠️ Gemini Error: timed out")
+            except Exception as e:
+                results.append(f"⚠️ Gemini Error: {str(e) or type(e).__name__}")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+# ================================
+# FETCH JOBS (LinkedIn Scraper)
+# ================================
+def iter_jobs(keywords, location, max_items=5, dataset_client=None):
+    """
+    Yield postings from the Apify actor run one dataset page at a time,
+    stopping at max_items. Pass dataset_client (e.g. a LocalDatasetClient)
+    to read from an existing dataset instead of starting an actor run.
+    """
+    if dataset_client is None:
+        from apify_client import ApifyClient  # deferred: only needed when actually fetching
+
+        client = ApifyClient(APIFY_TOKEN)
         run_input = {
             "queries": [f"{keywords} in {location}"],
             "maxResults": max_items,
         }
-
         run = client.actor(APIFY_ACTOR).call(run_input=run_input)
-        dataset_items = list(client.dataset(run["defaultDatasetId"]).iterate_items())
+        dataset_client = client.dataset(run["defaultDatasetId"])
 
-        if not dataset_items:
-            raise ValueError("No jobs found for given query.")
+    yield from iter_dataset_items(dataset_client, max_items)
+
+
+def _fetch_jobs_live(keywords, location, max_items):
+    # Extract skills once at ingestion (batch by batch, while later pages are
+    # still downloading); searches reuse them from the job_skills table
+    jobs = ingest_job_stream(iter_jobs(keywords, location, max_items))
 
-        return dataset_items[:max_items]
+    if not jobs:
+        raise ValueError("No jobs found for given query.")
+    return jobs
+
+
+def _fetch_query(keywords, location, max_items, use_cache=True):
+    """One actor run (or cache hit) for a single keyword/location pair."""
+    if not use_cache:
+        return _fetch_jobs_live(keywords, location, max_items)
+    return models.get("search_cache").get_or_fetch(
+        keywords, location, max_items, lambda: _fetch_jobs_live(keywords, location, max_items),
+        source=APIFY_ACTOR,
+    )
+
+
+def fetch_jobs(keywords, location, max_items=5, use_cache=True, per_query=None, timeout=FANOUT_TIMEOUT):
+    """
+    Fetch jobs dynamically from LinkedIn using Apify.
+    Comma-separated keywords (and ";"-separated locations) are each sent as
+    their own actor run, concurrently; results are merged and deduplicated
+    by Job URL. Every run goes through the search cache: a recent identical
+    search is answered immediately, and a stale one is served while it refreshes.
+    """
+    queries = split_queries(keywords, location)
+    try:
+        if len(queries) == 1:
+            jobs = _fetch_query(keywords, location, max_items, use_cache)
+        else:
+            jobs = fan_out(
+                queries, lambda kw, loc, quota: _fetch_query(kw, loc, quota, use_cache),
+                max_items, per_query=per_query, timeout=timeout,
+            )
+        if not jobs:
+            raise ValueError("No jobs found for given query.")
+        return jobs
 
     except Exception as e:
         print(f"⚠️ Apify job fetch failed: {e}")
         # fallback data
-        return [
-            {
-                "Job Title": "AI Engineer",
-                "Company Name": "Techify Labs",
-                "Location": "Bangalore, India",
-                "Description": "We’re hiring an AI Engineer with ML, Python, and TensorFlow experience.",
-                "Skills/Tags": "Python, TensorFlow, Machine Learning, Deep Learning",
-                "Job URL": "https://www.linkedin.com/jobs/view/ai-engineer"
-            },
-            {
-                "Job Title": "Data Scientist",
-                "Company Name": "DataWiz Analytics",
-                "Location": "Chennai, India",
-                "Description": "Looking for a Data Scientist experienced in NLP, AWS, and Scikit-learn.",
-                "Skills/Tags": "Python, NLP, AWS, Scikit-learn",
-                "Job URL": "https://www.linkedin.com/jobs/view/data-scientist"
-            },
-        ]
+        return [dict(job) for job in FALLBACK_JOBS]
+
+
+FALLBACK_JOBS = [
+    {
+        "Job Title": "AI Engineer",
+        "Company Name": "Techify Labs",
+        "Location": "Bangalore, India",
+        "Description": "We’re hiring an AI Engineer with ML, Python, and TensorFlow experience.",
+        "Skills/Tags": "Python, TensorFlow, Machine Learning, Deep Learning",
+        "Job URL": "https://www.linkedin.com/jobs/view/ai-engineer"
+    },
+    {
+        "Job Title": "Data Scientist",
+        "Company Name": "DataWiz Analytics",
+        "Location": "Chennai, India",
+        "Description": "Looking for a Data Scientist experienced in NLP, AWS, and Scikit-learn.",
+        "Skills/Tags": "Python, NLP, AWS, Scikit-learn",
+        "Job URL": "https://www.linkedin.com/jobs/view/data-scientist"
+    },
+]
 
 
 # ================================
 # MATCH RESUME WITH JOBS
 # ================================
-def match_resume_with_jobs(resume_path, keywords, location, max_items=5, username="guest"):
-    """Parse resume, fetch jobs, and score alignment."""
+def _build_result(job, match):
+    skills_text = job.get("Skills/Tags") or job.get("skills") or ""
+    skill_list = [s.strip() for s in skills_text.split(",") if s.strip()]
+
+    return {
+        "title": job.get("Job Title", "Unknown Role"),
+        "company": job.get("Company Name", "Unknown Company"),
+        "location": job.get("Location", "Unknown Location"),
+        "skills": skill_list or ["No skills found"],
+        "score": match.get("score", 0),
+        "matched": match.get("matched_skills", []),
+        "missing": match.get("missing_skills", []),
+        "link": job.get("Job URL", "No link available"),
+        "learning_path": None,  # filled in by the eager batch path when it covers the job
+    }
+
+
+def match_resume_with_job_stream(resume, keywords, location, max_items=1000, dataset_client=None):
+    """
+    Streaming variant for large scrapes: postings are paged out of the
+    dataset on a background thread and matched batch by batch while later
+    pages are still downloading. Yields scored results (no Gemini fields)
+    in dataset order; memory stays bounded by the pipeline queue.
+    """
+    resume_data = parse_resume(resume)
+    jobs = iter_jobs(keywords, location, max_items, dataset_client=dataset_client)
+    for _, ingested in pipeline_batches(jobs, ingest_jobs):
+        for job in ingested:
+            job_data = {"skills": job["Extracted Skills"]}
+            yield _build_result(job, match_resume_to_job(resume_data, job_data))
+
+
+def match_resume_with_jobs(resume, keywords, location, max_items=5, username="guest", lazy=False):
+    """
+    Parse resume, fetch jobs, and score alignment.
+
+    With lazy=True the scored results are returned without calling Gemini;
+    "summary" and "ai_questions" are LazyValue handles that are generated
+    (and memoized) only when read.
+    """
     print("📄 Parsing resume...")
-    resume_data = parse_resume(resume_path)
+    resume_data = parse_resume(resume)  # PDF path or bytes
 
     print("🌐 Fetching job listings...")
     jobs = fetch_jobs(keywords, location, max_items)
     results = []
 
-    for job in jobs:
-        job_data = apify_job_to_skill_dict(job)
-        match = match_resume_to_job(resume_data, job_data)
-
-        skills_text = job.get("Skills/Tags") or job.get("skills") or ""
-        skill_list = [s.strip() for s in skills_text.split(",") if s.strip()]
-
-        summary = summarize_skills(
-            job.get("Job Title", "Unknown"),
-            match.get("matched_skills", []),
-            match.get("missing_skills", []),
-        )
-
-        questions = generate_questions(
-            job.get("Job Title", "Unknown"),
-            skill_list,
-            match.get("matched_skills", []),
-            match.get("missing_skills", []),
+    # Reuses skills extracted at ingestion; unseen postings get one batched NER pass
+    job_dicts = apify_jobs_to_skill_dicts(jobs)
+
+    for job, job_data in zip(jobs, job_dicts):
+        results.append(_build_result(job, match_resume_to_job(resume_data, job_data)))
+
+    # Summaries and interview questions for every job
+    calls = []
+    for job, r in zip(jobs, results):
+        title = job.get("Job Title", "Unknown")
+        skill_list = [s for s in r["skills"] if s != "No skills found"]
+        calls.append(lambda t=title, r=r: summarize_skills(t, r["matched"], r["missing"]))
+        calls.append(lambda t=title, sk=skill_list, r=r: generate_questions(t, sk, r["matched"], r["missing"]))
+
+    if lazy:
+        for i, r in enumerate(results):
+            r["summary"] = LazyValue(calls[2 * i])
+            r["ai_questions"] = LazyValue(calls[2 * i + 1])
+    else:
+        # One structured request per batch of jobs; entries the batch reply
+        # did not cover fall back to per-job calls, issued concurrently
+        print("🧠 Generating summaries and interview questions...")
+        insights = generate_job_insights_batch(results, fallback=False, model_name=GEMINI_MODEL, timeout=LLM_TIMEOUT)
+        for r, insight in zip(results, insights):
+            if insight:
+                r["summary"] = insight["summary"]
+                r["ai_questions"] = "\n".join(insight["questions"])
+                r["learning_path"] = insight["learning_path"]
+
+        failed = [i for i, insight in enumerate(insights) if insight is None]
+        llm_outputs = run_llm_calls([call for i in failed for call in (calls[2 * i], calls[2 * i + 1])])
+        for n, i in enumerate(failed):
+            results[i]["summary"] = llm_outputs[2 * n]
+            results[i]["ai_questions"] = llm_outputs[2 * n + 1]
+
+    results = sorted(results, key=lambda x: x["score"], reverse=True)
+    save_search_results(username, keywords, location, results)
+    return results
+
+
+def save_search_results(username, keywords, location, results, background=ASYNC_SEARCH_WRITES):
+    """
+    Store every result (searches table) plus the best match (user_searches)
+    in one transaction. Summaries are stored only if already generated; lazy
+    handles are not forced.
+    """
+    if not results:
+        return
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    rows = [
+        (
+            username, keywords, location, r["title"], r["company"],
+            ", ".join(r["matched"]), ", ".join(r["missing"]),
+            r["summary"] if isinstance(r.get("summary"), str) else None,
+            r["score"], r.get("link"), now,
         )
-
-        result = {
-            "title": job.get("Job Title", "Unknown Role"),
-            "company": job.get("Company Name", "Unknown Company"),
-            "location": job.get("Location", "Unknown Location"),
-            "skills": skill_list or ["No skills found"],
-            "score": match.get("score", 0),
-            "matched": match.get("matched_skills", []),
-            "missing": match.get("missing_skills", []),
-            "link": job.get("Job URL", "No link available"),
-            "summary": summary,
-            "ai_questions": questions,
-        }
-
-        results.append(result)
-
-    # Save top result in DB
-    if results:
-        conn = sqlite3.connect("career_captain.db")
-        cursor = conn.cursor()
-        cursor.execute("""
+        for r in results
+    ]
+    statements = [
+        ("""
+            INSERT INTO searches (user_email, keywords, location, job_title, company,
+                                  matched_skills, missing_skills, summary, score, link, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows),
+        ("""
             INSERT INTO user_searches (username, keywords, location, timestamp, top_job, score)
             VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            username, keywords, location, datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            results[0]["title"], results[0]["score"]
-        ))
-        conn.commit()
-        conn.close()
-
-    return sorted(results, key=lambda x: x["score"], reverse=True)
+        """, [(username, keywords, location, now, results[0]["title"], results[0]["score"])]),
+    ]
+    if background:
+        _search_writer.submit(statements)
+    else:
+        write_batch(get_db, statements)
+
+
+# ================================
+# SEARCH THE LOCAL JOB INDEX (no Apify call)
+# ================================
+def index_stored_jobs():
+    """Add every posting in the local job store to the skill index."""
+    from backend.job_store import JobStore
+
+    batch, total = [], 0
+    for job in JobStore().iter_all():
+        batch.append(job)
+        if len(batch) == 500:
+            total += len(ingest_jobs(batch))
+            batch = []
+    return total + len(ingest_jobs(batch))
+
+
+def search_indexed_jobs(resume, k=10):
+    """Best k already-ingested postings for a resume, straight from the inverted skill index."""
+    resume_data = parse_resume(resume)
+    return search_skill_index(resume_data, k)
 
 
 # ================================
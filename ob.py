@@ -1,17 +1,24 @@
 # streamlit_app.py
 import streamlit as st
-import threading
 import time
-import json
-import os
 import base64
 import datetime
 import pymysql
+from backend.db_pool import ConnectionPool
+from backend.match_writer import write_batch
+from backend.job_store import JobStore
+from backend.resume_cache import content_hash
+from backend.job_stream import iter_dataset_items
+from backend.search_cache import SearchCache
+from backend.fanout import split_queries, fan_out
+from backend.task_queue import TaskQueue, QueueFull
+from backend.skill_analytics import ANALYTICS_TABLES, analytics_statements, top_missing_skills, keyword_average_scores
 from pprint import pprint
 
 # Import your parser + matching modules (adjust paths if needed)
 # parse_resume should return {'text':..., 'skills': [...], 'name':..., 'email':..., 'phone':..., 'no_of_pages': int}
-from backend.resume_job_parser import parse_resume, apify_job_to_skill_dict, SKILLS_DICT  # your existing module
+from backend.resume_job_parser import parse_resume, apify_jobs_to_skill_dicts, ingest_jobs, ingest_job_stream, get_skill_matcher  # your existing module
+from backend import models
 from main import match_resume_with_jobs  # if you have this orchestrator; else we call match_resume_to_job directly
 from backend.resume_job_parser import extract_skills  # if available (the hybrid NER + dict)
 
@@ -25,23 +32,50 @@ DB_CONFIG = {
     "db": "sra"
 }
 APIFY_API_KEY = "YOUR_APIFY_KEY"  # optional
+APIFY_ACTOR_ID = "codemaverick/naukri-job-scraper-latest"
 USE_OFFLINE_JOBS = True  # Set to False for live Apify scraping
-JOBS_CACHE_FILE = "data/jobs_cache.json"
+JOBS_CACHE_FILE = "data/jobs_cache.json"  # legacy cache, migrated into the job store on first use
+
+models.register("job_store", JobStore)
+models.register("search_cache", SearchCache)
 
 # -------------------------
 # DB Helpers
 # -------------------------
+DB_POOL_SIZE = 10
+
+def _connect(database=DB_CONFIG["db"]):
+    return pymysql.connect(host=DB_CONFIG["host"], user=DB_CONFIG["user"],
+                           password=DB_CONFIG["password"], database=database,
+                           cursorclass=pymysql.cursors.DictCursor)
+
+# Shared by every Streamlit session and the background workers; connections
+# already have the `sra` database selected.
+_db_pool = ConnectionPool(_connect, max_size=DB_POOL_SIZE)
+
 def get_db_conn():
-    conn = pymysql.connect(host=DB_CONFIG["host"], user=DB_CONFIG["user"],
-                           password=DB_CONFIG["password"], cursorclass=pymysql.cursors.DictCursor)
-    return conn
+    """Pooled connection; conn.close() returns it to the pool."""
+    return _db_pool.acquire()
+
+_tables_ready = False
 
 def ensure_db_tables():
+    """Create database and tables once per process (app() calls this on every rerun)."""
+    global _tables_ready
+    if _tables_ready:
+        return
+    # The database itself has to exist before pooled connections can select it
+    bootstrap = _connect(database=None)
+    try:
+        with bootstrap.cursor() as cur:
+            cur.execute(f"CREATE DATABASE IF NOT EXISTS {DB_CONFIG['db']};")
+        bootstrap.commit()
+    finally:
+        bootstrap.close()
+
     conn = get_db_conn()
     try:
         with conn.cursor() as cur:
-            cur.execute("CREATE DATABASE IF NOT EXISTS sra;")
-            cur.execute("USE sra;")
             cur.execute("""
             CREATE TABLE IF NOT EXISTS users (
                 id INT NOT NULL AUTO_INCREMENT,
@@ -79,9 +113,12 @@ def ensure_db_tables():
                 matched_at VARCHAR(50),
                 PRIMARY KEY (id)
             );""")
+            for ddl in ANALYTICS_TABLES:
+                cur.execute(ddl)
         conn.commit()
     finally:
         conn.close()
+    _tables_ready = True
 
 # -------------------------
 # Skill extraction helpers
@@ -116,41 +153,26 @@ def extract_section_text(full_text: str, headers):
     return "\n".join(out).strip()
 
 def extract_skills_from_text(full_text):
-    """Hybrid: SKILL_DICT matches + simple tokenization to find tech names + lowercase normalized."""
+    """Dictionary matches via the shared Aho-Corasick matcher, lowercase normalized."""
     if not full_text:
         return []
-    found = set()
-    low = full_text.lower()
-    # keyword dictionary match (SKILLS_DICT from your resume parser)
-    try:
-        for s in SKILLS_DICT:
-            if s.lower() in low:
-                found.add(s.lower())
-    except Exception:
-        pass
-    # simple regex-like detection for common tech tokens (e.g., "reactjs", "node.js", "c++", "tensorflow")
-    tokens = set([t.strip(".,()[]") for t in low.replace("/", " ").replace("-", " ").split()])
-    for tok in tokens:
-        if len(tok) > 1 and tok.isalnum():
-            # if token matches known tech substring
-            for s in SKILLS_DICT:
-                if tok in s.lower():
-                    found.add(s.lower())
-    return sorted(found)
+    return sorted(s.lower() for s in get_skill_matcher().find(full_text))
 
 # -------------------------
 # Jobs fetchers
 # -------------------------
-def load_cached_jobs():
-    if os.path.exists(JOBS_CACHE_FILE):
-        with open(JOBS_CACHE_FILE, "r", encoding="utf-8") as fh:
-            return json.load(fh)
-    return []
+def get_job_store():
+    store = models.get("job_store")
+    store.migrate_json_cache(JOBS_CACHE_FILE)  # no-op once the old JSON cache has been imported
+    return store
 
-def save_cached_jobs(jobs):
-    os.makedirs(os.path.dirname(JOBS_CACHE_FILE) or ".", exist_ok=True)
-    with open(JOBS_CACHE_FILE, "w", encoding="utf-8") as fh:
-        json.dump(jobs, fh, ensure_ascii=False, indent=2)
+def load_cached_jobs(limit=5, before_id=None, keyword=None, location=None):
+    """One page of stored jobs, newest first (see JobStore.page)."""
+    return get_job_store().page(limit=limit, before_id=before_id, keyword=keyword, location=location)
+
+def save_cached_jobs(jobs, keywords="", location=""):
+    """Append fetched jobs to the local job store (duplicates by Job URL / content are skipped)."""
+    return get_job_store().append(jobs, keywords=keywords, location=location)
 
 def fetch_jobs_offline(keywords, location, max_items=10):
     # quick dummy job set with skills
@@ -177,106 +199,185 @@ def fetch_jobs_offline(keywords, location, max_items=10):
             "Job URL": "https://example.com/job/ds-1"
         }
     ]
-    out = dummy[:max_items]
-    save_cached_jobs(out)
+    out = ingest_jobs(dummy[:max_items])
+    save_cached_jobs(out, keywords, location)
     return out
 
 def fetch_jobs_live_apify(keywords, location, max_items=10):
+    """
+    One concurrent actor run per comma-separated keyword, merged and
+    deduplicated by Job URL (see backend.fanout). Each run is cached, so
+    identical recent searches skip the actor (see backend.search_cache).
+    """
+    def fetch_one(kw, loc, quota):
+        return models.get("search_cache").get_or_fetch(
+            kw, loc, quota, lambda: _run_apify_actor(kw, loc, quota), source=APIFY_ACTOR_ID
+        )
+
+    return fan_out(split_queries(keywords, location), fetch_one, max_items)
+
+def _run_apify_actor(keywords, location, max_items=10):
     # This will run the Apify actor synchronously (can be slow).
     # For responsive UI we run it in background thread (see worker below).
     # Implementation left as a placeholder — use apify_client to start actor and fetch dataset.
     from apify_client import ApifyClient
     client = ApifyClient(APIFY_API_KEY)
-    actor_id = "codemaverick/naukri-job-scraper-latest"
+    actor_id = APIFY_ACTOR_ID
     input_data = {"keywords": keywords, "location": location, "maxItems": max_items}
     run = client.actor(actor_id).call(run_input=input_data)
     dataset_id = run["defaultDatasetId"]
-    items = client.dataset(dataset_id).list_items().items
-    save_cached_jobs(items)
-    return items[:max_items]
+    # Page through the dataset (stops at max_items) instead of downloading it whole
+    items = ingest_job_stream(iter_dataset_items(client.dataset(dataset_id), max_items))
+    save_cached_jobs(items, keywords, location)
+    return items
+
+def index_job_matches():
+    """
+    Backfill the inverted skill index from postings already stored in
+    job_matches. URLs that ingest_jobs already indexed are left as they are;
+    postings without a link are keyed by their stored fields.
+    """
+    conn = get_db_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT DISTINCT job_title, company, job_skills, job_link FROM job_matches")
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+    models.get("skill_index").add([
+        {
+            "url": r["job_link"] or None,
+            "content_hash": None if r["job_link"] else content_hash(
+                f"{r['job_title']}\n{r['company']}\n{r['job_skills']}".encode("utf-8")
+            ),
+            "title": r["job_title"],
+            "company": r["company"],
+            "skills": [s for s in (r["job_skills"] or "").split(",") if s],
+        }
+        for r in rows
+    ])
+    return len(rows)
 
 # -------------------------
 # Background worker for live scraping & matching
 # -------------------------
-def background_scrape_and_match(keywords, location, max_items, user_id, resume_skills):
+INSERT_JOB_MATCH_SQL = """
+    INSERT INTO job_matches (user_id, job_title, company, job_skills, matched_skills, missing_skills, job_link, score, matched_at)
+    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
+"""
+
+def background_scrape_and_match(keywords, location, max_items, user_id, resume_skills, progress=None):
     """
-    Background thread: fetch jobs (live or offline), filter by keywords,
-    perform matching, store matches in DB and push into session_state
+    Fetch jobs (live or offline), filter by keywords, perform matching,
+    store matches in DB and return the results, best first.
+    progress(fraction, message) is called between stages.
     """
-    st.session_state["scrape_status"] = "running"
-    try:
-        if USE_OFFLINE_JOBS:
-            jobs = fetch_jobs_offline(keywords, location, max_items)
-        else:
-            jobs = fetch_jobs_live_apify(keywords, location, max_items)
-    except Exception as e:
-        st.session_state["scrape_status"] = f"error: {str(e)}"
-        return
+    progress = progress or (lambda fraction, message="": None)
+    progress(0.05, "Fetching jobs")
+    if USE_OFFLINE_JOBS:
+        jobs = fetch_jobs_offline(keywords, location, max_items)
+    else:
+        jobs = fetch_jobs_live_apify(keywords, location, max_items)
+    progress(0.6, f"Matching {len(jobs)} jobs")
 
     # Filter jobs by keywords: keep only those that contain any of the keywords
     kw_list = [k.strip().lower() for k in keywords.split(",") if k.strip()]
     filtered = []
+    job_keywords = []  # keywords each kept job matched, for the analytics aggregates
     for j in jobs:
         job_text = (j.get("Job Title", "") + " " + j.get("Description", "") + " " + j.get("Skills/Tags", "")).lower()
         if not kw_list:
             filtered.append(j)
+            job_keywords.append([])
             continue
         # keep if any keyword present in job_text
-        if any(kw in job_text for kw in kw_list):
+        hits = [kw for kw in kw_list if kw in job_text]
+        if hits:
             filtered.append(j)
+            job_keywords.append(hits)
 
     # match each job with resume skills (simple set overlap)
     results = []
-    conn = get_db_conn()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("USE sra;")
-            for job in filtered:
-                job_dict = apify_job_to_skill_dict(job)
-                job_skills = job_dict.get("skills", [])
-                resume_set = set([s.lower() for s in resume_skills])
-                job_set = set([s.lower() for s in job_skills])
-                matched = sorted(list(resume_set & job_set))
-                missing = sorted(list(job_set - resume_set))
-                score = (len(matched) / len(job_set) * 100) if job_set else 0.0
-
-                # store match in DB
-                now = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-                cur.execute("""
-                    INSERT INTO job_matches (user_id, job_title, company, job_skills, matched_skills, missing_skills, job_link, score, matched_at)
-                    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
-                """, (
-                    user_id,
-                    job.get("Job Title") or "No title",
-                    job.get("Company") or "Unknown",
-                    ",".join(job_skills),
-                    ",".join(matched),
-                    ",".join(missing),
-                    job.get("Job URL") or job.get("Link") or "",
-                    float(score),
-                    now
-                ))
-                results.append({
-                    "title": job.get("Job Title"),
-                    "company": job.get("Company"),
-                    "location": job.get("Location"),
-                    "skills": job_skills,
-                    "matched": matched,
-                    "missing": missing,
-                    "score": round(score, 2),
-                    "link": job.get("Job URL")
-                })
-            conn.commit()
-    finally:
-        conn.close()
-
-    # set results to session state so Streamlit UI can consume
-    st.session_state["job_results"] = sorted(results, key=lambda x: x["score"], reverse=True)
-    st.session_state["scrape_status"] = "done"
+    rows = []
+    gaps = []
+    job_dicts = apify_jobs_to_skill_dicts(filtered)  # skills were extracted at ingestion
+    resume_set = set([s.lower() for s in resume_skills])
+    now = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    for job, job_dict, hits in zip(filtered, job_dicts, job_keywords):
+        job_skills = job_dict.get("skills", [])
+        job_set = set([s.lower() for s in job_skills])
+        matched = sorted(list(resume_set & job_set))
+        missing = sorted(list(job_set - resume_set))
+        score = (len(matched) / len(job_set) * 100) if job_set else 0.0
+
+        rows.append((
+            user_id,
+            job.get("Job Title") or "No title",
+            job.get("Company") or "Unknown",
+            ",".join(job_skills),
+            ",".join(matched),
+            ",".join(missing),
+            job.get("Job URL") or job.get("Link") or "",
+            float(score),
+            now
+        ))
+        gaps.append((hits, matched, missing, score))
+        results.append({
+            "title": job.get("Job Title"),
+            "company": job.get("Company"),
+            "location": job.get("Location"),
+            "skills": job_skills,
+            "matched": matched,
+            "missing": missing,
+            "score": round(score, 2),
+            "link": job.get("Job URL")
+        })
+
+    # store all matches and their analytics counts in one transaction, after scoring
+    progress(0.9, "Saving matches")
+    # (inline: the task is only "done" once its matches are stored, and a failed write is retried)
+    statements = [(INSERT_JOB_MATCH_SQL, rows)] + analytics_statements(user_id, now, gaps)
+    write_batch(get_db_conn, statements)
+
+    return sorted(results, key=lambda x: x["score"], reverse=True)
+
+def scrape_and_match_task(task):
+    """Task-queue handler; the payload holds background_scrape_and_match's arguments."""
+    return background_scrape_and_match(progress=task.progress, **task.payload)
+
+def _build_task_queue():
+    queue = TaskQueue()
+    queue.register("scrape_and_match", scrape_and_match_task)
+    return queue.start()
+
+# One queue (and worker pool) per process, shared by every session across reruns
+models.register("task_queue", _build_task_queue)
 
 # -------------------------
 # App UI
 # -------------------------
+@st.fragment(run_every=2)
+def task_status_panel():
+    """Polls the current task; reruns the whole app once it finishes so results show up."""
+    task_id = st.session_state.get("task_id")
+    task = models.get("task_queue").get(task_id) if task_id else None
+    if task is None:
+        st.markdown("**Scrape status:** idle")
+        return
+    status = task["status"]
+    if status == "failed":
+        status = f"error: {task['error']}"
+    elif task["cancel_requested"] and status == "running":
+        status = "cancelling"
+    st.markdown("**Scrape status:** " + status)
+    if task["status"] in ("queued", "running"):
+        st.progress(task["progress"], text=task["message"] or "Waiting for a free worker")
+        if st.button("Cancel", key=f"cancel_{task_id}"):
+            models.get("task_queue").cancel(task_id)
+    elif st.session_state.get("rendered_task") != (task_id, task["status"]):
+        st.session_state.rendered_task = (task_id, task["status"])
+        st.rerun()
+
 def app():
     st.set_page_config(page_title="Career Captain - Async Matcher", layout="wide")
     st.title("🚀 Career Captain (Async Job Matcher)")
@@ -288,10 +389,8 @@ def app():
         st.session_state.logged_in = False
     if "user" not in st.session_state:
         st.session_state.user = None
-    if "job_results" not in st.session_state:
-        st.session_state.job_results = []
-    if "scrape_status" not in st.session_state:
-        st.session_state.scrape_status = "idle"
+    if "task_id" not in st.session_state:
+        st.session_state.task_id = None
 
     # Sidebar: login / register
     with st.sidebar:
@@ -303,7 +402,6 @@ def app():
             conn = get_db_conn()
             try:
                 with conn.cursor() as cur:
-                    cur.execute("USE sra;")
                     cur.execute("SELECT * FROM users WHERE username=%s AND password=%s", (username, password))
                     row = cur.fetchone()
                     if row:
@@ -325,7 +423,6 @@ def app():
             conn = get_db_conn()
             try:
                 with conn.cursor() as cur:
-                    cur.execute("USE sra;")
                     now = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
                     cur.execute("INSERT IGNORE INTO users (username,password,name,email,created_at) VALUES (%s,%s,%s,%s,%s)",
                                 (new_user, new_pass, new_name, new_email, now))
@@ -340,14 +437,9 @@ def app():
         st.subheader("Upload Resume (PDF)")
         uploaded_file = st.file_uploader("Choose PDF", type=["pdf"])
         if uploaded_file:
-            save_path = os.path.join("Uploaded_Resumes", uploaded_file.name)
-            os.makedirs("Uploaded_Resumes", exist_ok=True)
-            with open(save_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
-            st.success(f"Saved resume to {save_path}")
-            # parse it now
+            # parse it in memory (no temp file, so concurrent uploads cannot clash)
             try:
-                resume_data = parse_resume(save_path)  # your parser
+                resume_data = parse_resume(uploaded_file.getbuffer())  # your parser
             except Exception as e:
                 st.error(f"Parsing error: {e}")
                 resume_data = {}
@@ -373,7 +465,6 @@ def app():
                 conn = get_db_conn()
                 try:
                     with conn.cursor() as cur:
-                        cur.execute("USE sra;")
                         now = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
                         user_id = st.session_state.user["id"] if st.session_state.logged_in else None
                         cur.execute("""
@@ -381,7 +472,7 @@ def app():
                             VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
                         """, (
                             user_id,
-                            save_path,
+                            uploaded_file.name,
                             parsed_text,
                             ",".join(parsed_skills),
                             projects_txt,
@@ -396,7 +487,7 @@ def app():
 
             # stash parsed resume in session for matching
             st.session_state["current_resume"] = {
-                "path": save_path,
+                "name": uploaded_file.name,
                 "text": parsed_text,
                 "skills": parsed_skills,
                 "projects_skills": projects_skills,
@@ -416,24 +507,33 @@ def app():
             st.button("Get Jobs (login + upload resume first)", disabled=True)
         else:
             if st.button("Get Jobs"):
-                # launch background thread
-                st.session_state.scrape_status = "queued"
+                # queue a background task; workers are bounded, so a busy queue refuses new work
                 user_id = st.session_state.user["id"]
-                resume_skills = st.session_state["current_resume"]["skills"]
-                t = threading.Thread(target=background_scrape_and_match,
-                                     args=(keywords, location, max_items, user_id, resume_skills),
-                                     daemon=True)
-                t.start()
-                st.success("Started background job: fetching & matching. Check job results panel on the right.")
-
-        st.markdown("**Scrape status:** " + str(st.session_state.scrape_status))
+                payload = {
+                    "keywords": keywords,
+                    "location": location,
+                    "max_items": max_items,
+                    "user_id": user_id,
+                    "resume_skills": st.session_state["current_resume"]["skills"],
+                }
+                try:
+                    st.session_state.task_id = models.get("task_queue").submit(
+                        "scrape_and_match", payload, owner=str(user_id)
+                    )
+                    st.success("Queued background job: fetching & matching. Check job results panel on the right.")
+                except QueueFull as e:
+                    st.warning(str(e))
+
+        task_status_panel()
         st.markdown("---")
         st.markdown("⚡ Use offline mode for fast testing (no API keys). Toggle `USE_OFFLINE_JOBS` in config.")
 
     with right:
         st.subheader("Job Results")
-        if st.session_state.get("job_results"):
-            for idx, r in enumerate(st.session_state["job_results"]):
+        task = models.get("task_queue").get(st.session_state.task_id) if st.session_state.task_id else None
+        job_results = task["result"] if task and task["status"] == "done" else []
+        if job_results:
+            for idx, r in enumerate(job_results):
                 with st.expander(f"{idx+1}. {r['title']} @ {r['company']} ({r['score']}%)"):
                     st.write("Location:", r.get("location"))
                     st.write("Job Skills:", r.get("skills"))
@@ -444,10 +544,24 @@ def app():
         else:
             st.info("No job results yet. Click Get Jobs to start scraping & matching (or load cached jobs).")
 
+        if st.session_state.logged_in:
+            st.markdown("---")
+            st.subheader("Skill Gaps")
+            this_month = datetime.datetime.utcnow().strftime("%Y-%m")
+            user_id = st.session_state.user["id"]
+            gap_month, gap_all = st.columns(2)
+            with gap_month:
+                st.markdown("**Most missing this month**")
+                st.dataframe(top_missing_skills(get_db_conn, user_id=user_id, period=this_month))
+            with gap_all:
+                st.markdown("**Most missing overall**")
+                st.dataframe(top_missing_skills(get_db_conn, user_id=user_id))
+            st.markdown("**Average score by keyword (this month)**")
+            st.dataframe(keyword_average_scores(get_db_conn, period=this_month))
+
         st.markdown("---")
         st.subheader("Cached Jobs (sample)")
-        cached = load_cached_jobs()
-        st.write(cached[:5])
+        st.write(load_cached_jobs(limit=5))
 
 if __name__ == "__main__":
     app()